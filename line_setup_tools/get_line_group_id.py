@@ -7,6 +7,7 @@ LINE Group ID 取得用スクリプト
 import sys
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 
 # プロジェクトルートをPythonパスに追加
 project_root = Path(__file__).parent
@@ -16,12 +17,24 @@ from services.core.config import Config
 from services.notification.line_bot import LineBotNotifier
 
 
+@lru_cache(maxsize=1)
+def _get_config() -> Config:
+    """設定を取得（プロセス内で1度だけ生成）"""
+    return Config()
+
+
+@lru_cache(maxsize=1)
+def _get_notifier() -> LineBotNotifier:
+    """LINE Bot通知クラスを取得（プロセス内で1度だけ生成）"""
+    return LineBotNotifier()
+
+
 def check_line_configuration():
     """LINE設定状況を確認"""
     print("📱 LINE Bot グループ設定確認")
     print("=" * 50)
     
-    config = Config()
+    config = _get_config()
     
     print("🔧 現在の設定:")
     print(f"  Channel ID: {config.line_channel_id}")
@@ -48,7 +61,7 @@ def test_line_group_connection(config):
         return False
     
     try:
-        line_bot = LineBotNotifier()
+        line_bot = _get_notifier()
         
         if not line_bot.enabled:
             print("❌ LINE Bot が無効化されています")
@@ -4,36 +4,82 @@
 LINE Group ID 取得用 Webhookサーバー
 """
 
-from flask import Flask, request, jsonify, abort
+from flask import Flask, Response, request, jsonify
 import json
 import hashlib
 import hmac
 import base64
+import binascii
+import logging
 import os
+import sys
+
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 
+# WEBHOOK_VERBOSE=true でヘッダー・ペイロードの詳細ログを有効化
+WEBHOOK_VERBOSE = os.getenv('WEBHOOK_VERBOSE', '').lower() in ('true', '1', 'yes')
+
+# リクエスト単位のログ（printの同期書き込みを避け、1行1レコードで出力）
+log = logging.getLogger("webhook")
+log.setLevel(logging.DEBUG if WEBHOOK_VERBOSE else logging.INFO)
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+log.addHandler(_log_handler)
+log.propagate = False
+
 # LINE Channel Secretを環境変数から取得
 LINE_CHANNEL_SECRET = os.getenv('LINE_CHANNEL_SECRET', '799dfc63eb76d45f6443f4be49833f47')
 
+# 鍵設定済みのHMACテンプレート（リクエストごとの鍵スケジュール再計算を省き、copy()して使用）
+_HMAC_TEMPLATE = hmac.new(LINE_CHANNEL_SECRET.encode('utf-8'), None, hashlib.sha256)
+
+def _json_loads(body: bytes):
+    """JSONを解析（orjsonがあれば使用）"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body.decode('utf-8'))
+
+def _json_dumps(data) -> str:
+    """JSONを1行の文字列に変換（orjsonがあれば使用）"""
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, ensure_ascii=False)
+
+def _json_response(payload: dict, status: int = 200):
+    """JSONレスポンスを生成（orjsonがあれば使用）"""
+    if orjson is not None:
+        return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+    response = jsonify(payload)
+    response.status_code = status
+    return response
+
 def validate_signature(body: bytes, signature: str) -> bool:
     """LINE Platform署名検証"""
     if not signature:
         return False
     
     try:
-        # 署名を生成
-        expected_signature = base64.b64encode(
-            hmac.new(
-                LINE_CHANNEL_SECRET.encode('utf-8'),
-                body,
-                hashlib.sha256
-            ).digest()
-        ).decode()
+        # 受信した署名をデコードし、生のダイジェスト同士を定数時間で比較
+        try:
+            signature_raw = base64.b64decode(signature, validate=True)
+        except (binascii.Error, ValueError):
+            return False
         
-        return hmac.compare_digest(signature, expected_signature)
+        mac = _HMAC_TEMPLATE.copy()
+        mac.update(body)
+        return len(signature_raw) == mac.digest_size and hmac.compare_digest(signature_raw, mac.digest())
     except Exception as e:
-        print(f"❌ 署名検証エラー: {e}")
+        log.error("❌ 署名検証エラー: %s", e)
         return False
 
 @app.route('/', methods=['GET'])
@@ -51,9 +97,7 @@ def webhook():
     try:
         # GETリクエストの場合（動作確認用）
         if request.method == 'GET':
-            print("=" * 60)
-            print("🔍 GET request received - webhook endpoint is working")
-            print("=" * 60)
+            log.info("🔍 GET request received - webhook endpoint is working")
             return jsonify({
                 "message": "Webhook endpoint is working",
                 "method": "GET",
@@ -61,40 +105,37 @@ def webhook():
             })
         
         # POSTリクエストの場合
-        print("=" * 60)
-        print("📨 LINE Webhook受信")
-        print("=" * 60)
-        
         # リクエストボディを取得
         body = request.get_data()
+        log.info("📨 LINE Webhook受信 body_bytes=%d", len(body))
         
         # 署名検証
         signature = request.headers.get('X-Line-Signature')
-        print(f"📝 X-Line-Signature: {signature}")
+        log.debug("📝 X-Line-Signature: %s", signature)
         
         if not validate_signature(body, signature):
-            print("❌ 署名検証失敗!")
-            print("   Channel Secretが正しく設定されているか確認してください")
-            abort(403)  # 署名検証失敗の場合は403を返す
+            log.warning("❌ 署名検証失敗! Channel Secretが正しく設定されているか確認してください")
+            # 署名検証失敗の場合はJSON解析・例外処理を経由せず即座に403を返す
+            return _json_response({"status": "error", "message": "Invalid signature"}, 403)
         
-        print("✅ 署名検証成功!")
+        log.info("✅ 署名検証成功!")
         
-        # リクエストヘッダーをログ出力
-        print("📥 リクエストヘッダー:")
-        for key, value in request.headers.items():
-            if key.lower() != 'x-line-signature':
-                print(f"  {key}: {value}")
+        # リクエストヘッダーのログ出力は詳細ログ有効時のみ（通常時は走査自体を省略）
+        if log.isEnabledFor(logging.DEBUG):
+            for key, value in request.headers.items():
+                if key.lower() != 'x-line-signature':
+                    log.debug("📥 header %s=%s", key, value)
         
         # JSONデータを解析
         try:
-            data = json.loads(body.decode('utf-8'))
+            data = _json_loads(body)
         except json.JSONDecodeError as e:
-            print(f"❌ JSON解析エラー: {e}")
-            return jsonify({"status": "error", "message": "Invalid JSON"}), 400
+            log.error("❌ JSON解析エラー: %s", e)
+            return _json_response({"status": "error", "message": "Invalid JSON"}, 400)
         
-        print("=" * 60)
-        print("📨 Webhook受信:")
-        print(json.dumps(data, indent=2, ensure_ascii=False))
+        # ペイロード全体のダンプはDEBUG時のみ（インデントなしで出力）
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("📨 payload=%s", _json_dumps(data))
         
         # Group ID と User ID を抽出
         if 'events' in data:
@@ -103,49 +144,36 @@ def webhook():
                     source = event['source']
                     source_type = source.get('type', 'unknown')
                     
-                    print("=" * 60)
-                    print(f"📍 送信元タイプ: {source_type}")
-                    
                     if source_type == 'group':
                         group_id = source.get('groupId')
                         user_id = source.get('userId')
-                        
-                        print(f"👥 Group ID: {group_id}")
-                        print(f"👤 User ID: {user_id}")
-                        print("=" * 60)
-                        print("🎯 グループ送信用設定コマンド:")
-                        print(f'export LINE_GROUP_ID="{group_id}"')
-                        print("=" * 60)
+                        log.info(
+                            "👥 Group ID: %s / 👤 User ID: %s\n"
+                            "🎯 グループ送信用設定コマンド:\nexport LINE_GROUP_ID=\"%s\"",
+                            group_id, user_id, group_id
+                        )
                         
                     elif source_type == 'user':
                         user_id = source.get('userId')
-                        print(f"👤 User ID: {user_id}")
-                        print("=" * 60)
-                        print("⚠️ このシステムはグループチャット専用です")
-                        print("グループでメッセージを送信してください")
-                        print("=" * 60)
+                        log.info(
+                            "👤 User ID: %s\n⚠️ このシステムはグループチャット専用です。"
+                            "グループでメッセージを送信してください",
+                            user_id
+                        )
+                    
+                    else:
+                        log.info("📍 送信元タイプ: %s", source_type)
         
         # 正常レスポンスを返す
-        response = jsonify({"status": "ok"})
-        response.status_code = 200
-        print("=" * 60)
-        print("✅ 200 OKレスポンスを返しました")
-        print("=" * 60)
+        response = _json_response({"status": "ok"})
+        log.info("✅ 200 OKレスポンスを返しました")
         return response
         
     except Exception as e:
-        print("=" * 60)
-        print(f"❌ エラー発生: {e}")
-        print(f"❌ エラータイプ: {type(e).__name__}")
-        import traceback
-        print(f"❌ スタックトレース:")
-        print(traceback.format_exc())
-        print("=" * 60)
+        log.exception("❌ エラー発生: %s (%s)", e, type(e).__name__)
         
         # エラー時も200を返す（LINEプラットフォーム用）
-        error_response = jsonify({"status": "error", "message": str(e)})
-        error_response.status_code = 200
-        return error_response
+        return _json_response({"status": "error", "message": str(e)})
 
 if __name__ == "__main__":
     print("🚀 Group ID取得用Webhookサーバー（署名検証対応版）")
@@ -167,5 +195,13 @@ if __name__ == "__main__":
     print("  3. ngrok URLをLINE Webhook URLに設定")
     print("  4. LINEグループでBotにメッセージ送信")
     print("  5. Group IDが表示されるのでコピー")
+    print("  ※ ヘッダー等の詳細ログは export WEBHOOK_VERBOSE=true で表示")
     print("=" * 60)
-    app.run(debug=True, port=5001)
+    
+    logging.basicConfig(level=logging.INFO)
+    if serve is not None:
+        # 本番用WSGIサーバー（リローダーなし・スレッドプールでLINEの再送も並行処理）
+        serve(app, host='0.0.0.0', port=5001, threads=8)
+    else:
+        print("⚠️ waitress が見つかりません。Flask開発サーバーで起動します（pip install waitress）")
+        app.run(host='0.0.0.0', port=5001, threaded=True)
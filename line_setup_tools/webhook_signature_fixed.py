@@ -9,31 +9,92 @@ import json
 import hashlib
 import hmac
 import base64
+import binascii
+import logging
 import os
+import sys
+import threading
+
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 
+# WEBHOOK_VERBOSE=true でヘッダー・ペイロードの詳細ログを有効化
+WEBHOOK_VERBOSE = os.getenv('WEBHOOK_VERBOSE', '').lower() in ('true', '1', 'yes')
+
+# リクエスト単位のログ（printの同期書き込みを避け、1行1レコードで出力）
+log = logging.getLogger("webhook")
+log.setLevel(logging.DEBUG if WEBHOOK_VERBOSE else logging.INFO)
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+log.addHandler(_log_handler)
+log.propagate = False
+
 # LINE Channel Secretを環境変数から取得
 LINE_CHANNEL_SECRET = os.getenv('LINE_CHANNEL_SECRET', '25d64f941d05535214a0462185672e91')
 
+# 鍵設定済みのHMACテンプレート（リクエストごとの鍵スケジュール再計算を省き、copy()して使用）
+_HMAC_TEMPLATE = hmac.new(LINE_CHANNEL_SECRET.encode('utf-8'), None, hashlib.sha256)
+
+def _json_loads(body: bytes):
+    """JSONを解析（orjsonがあればbytesのまま解析）"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body.decode('utf-8'))
+
+def _json_dumps_pretty(data) -> str:
+    """JSONを整形した文字列に変換（orjsonがあれば使用）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+# Group ID設定の保存先と、最後に保存した (group_id, user_id)
+GROUP_CONFIG_FILE = "line_group_config.txt"
+_last_written = (None, None)
+_config_write_lock = threading.Lock()
+
+def _save_group_config(group_id: str, user_id: str) -> bool:
+    """Group ID設定をファイルに保存（内容が変わらない場合は書き込まない）"""
+    global _last_written
+    
+    with _config_write_lock:
+        if (group_id, user_id) == _last_written:
+            return False
+        
+        # 一時ファイルに書き込んでから置き換え（同時リクエストでも壊れたファイルを残さない）
+        tmp_file = f"{GROUP_CONFIG_FILE}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(f"LINE_GROUP_ID={group_id}\nLINE_USER_ID={user_id}\n")
+        os.replace(tmp_file, GROUP_CONFIG_FILE)
+        
+        _last_written = (group_id, user_id)
+        return True
+
 def validate_signature(body: bytes, signature: str) -> bool:
     """LINE Platform署名検証"""
     if not signature:
         return False
     
     try:
-        # 署名を生成
-        expected_signature = base64.b64encode(
-            hmac.new(
-                LINE_CHANNEL_SECRET.encode('utf-8'),
-                body,
-                hashlib.sha256
-            ).digest()
-        ).decode()
+        # 受信した署名をデコードし、生のダイジェスト同士を定数時間で比較
+        try:
+            signature_raw = base64.b64decode(signature, validate=True)
+        except (binascii.Error, ValueError):
+            return False
         
-        return hmac.compare_digest(signature, expected_signature)
+        mac = _HMAC_TEMPLATE.copy()
+        mac.update(body)
+        return len(signature_raw) == mac.digest_size and hmac.compare_digest(signature_raw, mac.digest())
     except Exception as e:
-        print(f"❌ 署名検証エラー: {e}")
+        log.error("❌ 署名検証エラー: %s", e)
         return False
 
 @app.route('/', methods=['GET'])
@@ -52,10 +113,10 @@ def webhook():
     try:
         # GETリクエストの場合（動作確認用）
         if request.method == 'GET':
-            print("=" * 60)
-            print("🔍 GET request - webhook endpoint is working")
-            print(f"🔑 Channel Secret設定状況: {'✅ 設定済み' if LINE_CHANNEL_SECRET and LINE_CHANNEL_SECRET != 'your_channel_secret_here' else '❌ 未設定'}")
-            print("=" * 60)
+            log.info(
+                "🔍 GET request - webhook endpoint is working (🔑 Channel Secret設定状況: %s)",
+                '✅ 設定済み' if LINE_CHANNEL_SECRET and LINE_CHANNEL_SECRET != 'your_channel_secret_here' else '❌ 未設定'
+            )
             return jsonify({
                 "message": "Webhook endpoint is working",
                 "method": "GET",
@@ -63,108 +124,88 @@ def webhook():
             })
         
         # POSTリクエストの場合
-        print("=" * 60)
-        print("📨 LINE Webhook受信")
-        print("=" * 60)
-        
         # リクエストボディを取得
         body = request.get_data()
+        log.info("📨 LINE Webhook受信 body_bytes=%d", len(body))
         
         # 署名検証
         signature = request.headers.get('X-Line-Signature')
-        print(f"📝 X-Line-Signature: {signature}")
-        print(f"🔑 Channel Secret: {LINE_CHANNEL_SECRET[:20]}...")
+        log.debug("📝 X-Line-Signature: %s", signature)
+        log.debug("🔑 Channel Secret: %s...", LINE_CHANNEL_SECRET[:20])
         
         if not validate_signature(body, signature):
-            print("❌ 署名検証失敗!")
-            print("   Channel Secretが正しく設定されているか確認してください")
+            log.warning("❌ 署名検証失敗! Channel Secretが正しく設定されているか確認してください")
             abort(403)  # 署名検証失敗の場合は403を返す
         
-        print("✅ 署名検証成功!")
+        log.info("✅ 署名検証成功!")
         
-        # リクエストヘッダーをログ出力
-        print("📥 リクエストヘッダー:")
-        for key, value in request.headers.items():
-            if key.lower() != 'x-line-signature':  # 署名は既に表示済み
-                print(f"  {key}: {value}")
+        # リクエストヘッダーのログ出力は詳細ログ有効時のみ（通常時は走査自体を省略）
+        if log.isEnabledFor(logging.DEBUG):
+            for key, value in request.headers.items():
+                if key.lower() != 'x-line-signature':  # 署名は既に表示済み
+                    log.debug("📥 header %s=%s", key, value)
         
         # JSONデータを解析
         try:
-            data = json.loads(body.decode('utf-8'))
+            data = _json_loads(body)
         except json.JSONDecodeError as e:
-            print(f"❌ JSON解析エラー: {e}")
+            log.error("❌ JSON解析エラー: %s", e)
             return jsonify({"status": "error", "message": "Invalid JSON"}), 400
         
-        print("=" * 60)
-        print("📄 Webhook データ:")
-        print(json.dumps(data, indent=2, ensure_ascii=False))
+        # ペイロード全体のダンプはDEBUG時のみ
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("📄 Webhook データ:\n%s", _json_dumps_pretty(data))
         
         # Group ID と User ID を抽出
         if 'events' in data:
             for i, event in enumerate(data['events']):
-                print(f"\n📌 イベント {i+1}:")
-                print(f"   タイプ: {event.get('type', 'unknown')}")
+                event_type = event.get('type', 'unknown')
                 
                 if 'source' in event:
                     source = event['source']
                     source_type = source.get('type', 'unknown')
                     
-                    print(f"   送信元: {source_type}")
+                    log.info("📌 イベント %d: タイプ=%s 送信元=%s", i + 1, event_type, source_type)
                     
                     if source_type == 'group':
                         group_id = source.get('groupId')
                         user_id = source.get('userId')
                         
-                        print("=" * 60)
-                        print("🎯 グループチャット情報取得成功!")
-                        print(f"👥 Group ID: {group_id}")
-                        print(f"👤 User ID: {user_id}")
-                        print("=" * 60)
-                        print("📋 設定コマンド（コピーしてください）:")
-                        print(f'export LINE_GROUP_ID="{group_id}"')
-                        print("=" * 60)
+                        log.info(
+                            "🎯 グループチャット情報取得成功!\n👥 Group ID: %s\n👤 User ID: %s\n"
+                            "📋 設定コマンド（コピーしてください）:\nexport LINE_GROUP_ID=\"%s\"",
+                            group_id, user_id, group_id
+                        )
                         
                         # ファイルにも保存
-                        config_file = "line_group_config.txt"
-                        with open(config_file, "w", encoding="utf-8") as f:
-                            f.write(f"LINE_GROUP_ID={group_id}\n")
-                            f.write(f"LINE_USER_ID={user_id}\n")
-                        print(f"💾 設定を {config_file} に保存しました")
+                        if _save_group_config(group_id, user_id):
+                            log.info("💾 設定を %s に保存しました", GROUP_CONFIG_FILE)
                         
                     elif source_type == 'user':
                         user_id = source.get('userId')
-                        print("=" * 60)
-                        print("📱 個人チャット情報:")
-                        print(f"👤 User ID: {user_id}")
-                        print("⚠️ このシステムはグループチャット専用です")
-                        print("LINEグループでBotにメッセージを送信してください")
-                        print("=" * 60)
+                        log.info(
+                            "📱 個人チャット情報: 👤 User ID: %s\n⚠️ このシステムはグループチャット専用です。"
+                            "LINEグループでBotにメッセージを送信してください",
+                            user_id
+                        )
                         
                     else:
-                        print(f"⚠️ 未対応の送信元タイプ: {source_type}")
+                        log.info("⚠️ 未対応の送信元タイプ: %s", source_type)
+                else:
+                    log.info("📌 イベント %d: タイプ=%s", i + 1, event_type)
                 
                 # メッセージ内容も表示
-                if event.get('type') == 'message':
-                    message = event.get('message', {})
-                    message_text = message.get('text', '')
-                    print(f"   メッセージ: {message_text}")
+                if event_type == 'message':
+                    log.debug("   メッセージ: %s", event.get('message', {}).get('text', ''))
         
         # 正常レスポンスを返す
         response = jsonify({"status": "success"})
         response.status_code = 200
-        print("=" * 60)
-        print("✅ 200 OK レスポンスを返しました")
-        print("=" * 60)
+        log.info("✅ 200 OK レスポンスを返しました")
         return response
         
     except Exception as e:
-        print("=" * 60)
-        print(f"❌ 予期しないエラー: {e}")
-        print(f"❌ エラータイプ: {type(e).__name__}")
-        import traceback
-        print("❌ スタックトレース:")
-        print(traceback.format_exc())
-        print("=" * 60)
+        log.exception("❌ 予期しないエラー: %s (%s)", e, type(e).__name__)
         
         # エラー時も200を返す（LINEプラットフォーム要件）
         error_response = jsonify({"status": "error", "message": str(e)})
@@ -191,4 +232,10 @@ if __name__ == "__main__":
     print("5. Group IDが表示され、設定ファイルに保存されます")
     print("=" * 60)
     
-    app.run(debug=True, port=5001, host='0.0.0.0')
+    logging.basicConfig(level=logging.INFO)
+    if serve is not None:
+        # 本番用WSGIサーバー（リローダーなし・スレッドプールでLINEの再送も並行処理）
+        serve(app, host='0.0.0.0', port=5001, threads=8)
+    else:
+        print("⚠️ waitress が見つかりません。Flask開発サーバーで起動します（pip install waitress）")
+        app.run(host='0.0.0.0', port=5001, threaded=True)
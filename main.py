@@ -15,8 +15,12 @@ SMCL 納品リスト処理システム メインコントローラー
 
 import sys
 import os
+import re
+import logging
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # プロジェクトルートをPythonパスに追加
 project_root = Path(__file__).parent
@@ -25,11 +29,12 @@ sys.path.insert(0, str(project_root))
 from services.core.config import Config
 from services.core.logger import Logger
 from services.scraping.smcl_scraper import SMCLScraper
-from services.data_processing.csv_extractor import CSVExtractor
-from services.data_processing.excel_processor import ExcelProcessor
-from services.data_processing.pdf_image_processor import PDFImageProcessor
 from services.notification.line_bot import LineBotNotifier
 
+# 生成PDFの種別判定用パターン（1回の検索で判定）
+# 出庫依頼を含む場合は先頭の先読みでグループ1に一致させ、配車表キーワードより優先する
+_PDF_TYPE_RE = re.compile('^(?=.*?(出庫依頼))|アリスト|配車|LT')
+
 
 class DeliveryListProcessor:
     """納品リスト処理システムのメインクラス"""
@@ -38,34 +43,61 @@ class DeliveryListProcessor:
         self.config = Config()
         self.logger = Logger(__name__)
         self.scraper = None
-        self.csv_extractor = CSVExtractor()
-        self.excel_processor = ExcelProcessor(self.config)
-        self.pdf_image_processor = PDFImageProcessor(self.config)
         self.line_notifier = LineBotNotifier()
         
-        # 日付別ディレクトリを設定
-        self.today_str = datetime.now().strftime(self.config.date_folder_format)
+        # 日付別ディレクトリを設定（日付文字列は起動時に1度だけ生成）
+        now = datetime.now()
+        self.today_str = now.strftime(self.config.date_folder_format)
+        self.today_display_str = now.strftime('%Y年%m月%d日')
+        self.run_timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
         self.dated_output_dir = self.config.get_dated_output_dir(self.today_str)
         self.dated_download_dir = self.config.get_dated_download_dir(self.today_str)
         self.dated_logs_dir = self.config.get_dated_logs_dir(self.today_str)
         
+        # ディレクトリ走査結果のキャッシュ: (ディレクトリ, パターン) -> 最新順のファイルリスト
+        self._file_list_cache = {}
+        
+        # フェーズ5で作成した画像変換サマリーと対象PDFリスト（フェーズ6で再利用）
+        self._image_summary = None
+        self._phase5_pdf_files = None
+    
+    # データ処理系のクラスは初回使用時に読み込む（データなしの場合はExcel・PDF関連の読み込みを省略）
+    @cached_property
+    def csv_extractor(self):
+        """CSV抽出クラス"""
+        from services.data_processing.csv_extractor import CSVExtractor
+        return CSVExtractor()
+    
+    @cached_property
+    def excel_processor(self):
+        """Excel処理クラス"""
+        from services.data_processing.excel_processor import ExcelProcessor
+        return ExcelProcessor(self.config)
+    
+    @cached_property
+    def pdf_image_processor(self):
+        """PDF画像変換クラス"""
+        from services.data_processing.pdf_image_processor import PDFImageProcessor
+        return PDFImageProcessor(self.config)
+        
     def run(self):
         """メイン処理を実行"""
         try:
             self.logger.info("=== 納品リスト処理システム開始 ===")
-            self.logger.info(f"処理日: {self.today_str}")
-            self.logger.info(f"出力先: {self.dated_output_dir}")
+            self.logger.info("処理日: %s", self.today_str)
+            self.logger.info("出力先: %s", self.dated_output_dir)
             
             # ネットワークドライブの状態確認
             network_status = self.config.get_network_status()
             if network_status["use_network_storage"]:
                 if network_status["accessible"]:
-                    self.logger.info(f"ネットワークドライブ接続OK: {network_status['network_path']}")
+                    self.logger.info("ネットワークドライブ接続OK: %s", network_status['network_path'])
                 else:
-                    self.logger.warning(f"ネットワークドライブ接続NG: {network_status.get('error', '不明なエラー')}")
+                    self.logger.warning("ネットワークドライブ接続NG: %s", network_status.get('error', '不明なエラー'))
                     self.logger.info("ローカルフォルダを使用します")
             
             start_time = datetime.now()
+            self.run_timestamp = start_time.strftime('%Y-%m-%d %H:%M:%S')
             
             # # フェーズ1: スマクラログインと納品リストダウンロード
             if not self._phase1_scraping():
@@ -87,13 +119,18 @@ class DeliveryListProcessor:
             # # フェーズ3: マスタExcelとの付け合わせ
             validated_data, error_data = self._phase3_master_validation(extracted_data)
             
-            # # フェーズ4: 配車表・出庫依頼Excel作成
-            if not self._phase4_excel_generation(validated_data):
-                self.logger.error("フェーズ4: Excel生成が失敗しました")
-                return False
+            # ダウンロード済みPDFの画像変換はExcel生成と独立しているため、フェーズ4と並行して実行
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                downloaded_images_future = executor.submit(self._convert_downloaded_pdfs)
+                
+                # # フェーズ4: 配車表・出庫依頼Excel作成
+                if not self._phase4_excel_generation(validated_data):
+                    self.logger.error("フェーズ4: Excel生成が失敗しました")
+                    return False
                 
-            # # フェーズ5: PDF画像変換
-            converted_images = self._phase5_pdf_image_conversion()
+                # # フェーズ5: PDF画像変換（生成PDFを変換し、並行変換済みの結果と統合）
+                converted_images = self._phase5_pdf_image_conversion(downloaded_images_future.result())
+            
             if not converted_images:
                 self.logger.warning("フェーズ4.5: PDF画像変換で画像が生成されませんでした")
                 
@@ -103,12 +140,12 @@ class DeliveryListProcessor:
             # 処理完了
             end_time = datetime.now()
             duration = end_time - start_time
-            self.logger.info(f"=== 処理完了 (処理時間: {duration.total_seconds():.1f}秒) ===")
+            self.logger.info("=== 処理完了 (処理時間: %.1f秒) ===", duration.total_seconds())
             
             return True
             
         except Exception as e:
-            self.logger.error(f"メイン処理でエラーが発生しました: {str(e)}")
+            self.logger.error("メイン処理でエラーが発生しました: %s", e)
             self.logger.exception(e)
             return False
             
@@ -127,10 +164,14 @@ class DeliveryListProcessor:
             )
             
             # スマクラにログインして納品リストをダウンロード
-            return self.scraper.download_delivery_lists()
+            result = self.scraper.download_delivery_lists()
+            
+            # ダウンロードでファイルが増えるためキャッシュを破棄
+            self._file_list_cache.clear()
+            return result
             
         except Exception as e:
-            self.logger.error(f"フェーズ1でエラー: {str(e)}")
+            self.logger.error("フェーズ1でエラー: %s", e)
             return False
     
     def _phase2_data_extraction(self):
@@ -151,11 +192,11 @@ class DeliveryListProcessor:
             # アイテム数をカウント
             total_items = sum(len(doc.items) for doc in documents)
             
-            self.logger.info(f"合計 {total_items} 件のデータを抽出しました")
+            self.logger.info("合計 %d 件のデータを抽出しました", total_items)
             return documents
             
         except Exception as e:
-            self.logger.error(f"フェーズ2でエラー: {str(e)}")
+            self.logger.error("フェーズ2でエラー: %s", e)
             return None
     
     def _phase3_master_validation(self, extracted_data):
@@ -175,18 +216,18 @@ class DeliveryListProcessor:
                 )
                 
                 if success:
-                    self.logger.warning(f"エラーデータを「エラーリスト」シートに記載しました: {len(error_data)}件")
+                    self.logger.warning("エラーデータを「エラーリスト」シートに記載しました: %d件", len(error_data))
                 else:
                     # エラーリストシートへの書き込みが失敗した場合、バックアップファイルを作成
                     error_file = self.excel_processor.create_error_excel(error_data)
-                    self.logger.warning(f"エラーデータをバックアップファイルに出力しました: {error_file}")
+                    self.logger.warning("エラーデータをバックアップファイルに出力しました: %s", error_file)
             else:
                 self.logger.info("エラーはありませんでした")
                 
             return validated_data, error_data
             
         except Exception as e:
-            self.logger.error(f"フェーズ3でエラー: {str(e)}")
+            self.logger.error("フェーズ3でエラー: %s", e)
             return [], []
     
     def _phase4_excel_generation(self, validated_data):
@@ -199,6 +240,9 @@ class DeliveryListProcessor:
                 validated_data, self.config.master_excel_path
             )
             
+            # Excel・PDFが生成されるためキャッシュを破棄
+            self._file_list_cache.clear()
+            
             if success:
                 self.logger.info("倉庫別注文処理が正常に完了しました")
             else:
@@ -207,11 +251,27 @@ class DeliveryListProcessor:
             return success
             
         except Exception as e:
-            self.logger.error(f"フェーズ4でエラー: {str(e)}")
+            self.logger.error("フェーズ4でエラー: %s", e)
             return False
     
-    def _phase5_pdf_image_conversion(self):
-        """フェーズ5: PDF画像変換"""
+    def _convert_downloaded_pdfs(self):
+        """ダウンロード済みPDFを画像に変換（フェーズ4と並行実行）"""
+        try:
+            downloaded_pdf_files = self._get_downloaded_pdf_files()
+            if not downloaded_pdf_files:
+                return {}
+            
+            self.logger.info("ダウンロードPDFの画像変換を開始: %dファイル", len(downloaded_pdf_files))
+            # メインスレッドと並行して動くため、プロセスプールは起動せずこのスレッド内で逐次変換
+            return self.pdf_image_processor.process_all_pdfs(downloaded_pdf_files, self.dated_output_dir,
+                                                             max_workers=1)
+            
+        except Exception as e:
+            self.logger.error("ダウンロードPDF画像変換でエラー: %s", e)
+            return {}
+    
+    def _phase5_pdf_image_conversion(self, downloaded_images=None):
+        """フェーズ5: PDF画像変換（downloaded_images: 変換済みのダウンロードPDF画像）"""
         try:
             self.logger.info("フェーズ5: PDF画像変換処理開始")
             
@@ -219,37 +279,46 @@ class DeliveryListProcessor:
             generated_pdf_files = self._get_generated_pdf_files()
             downloaded_pdf_files = self._get_downloaded_pdf_files()
             all_pdf_files = downloaded_pdf_files + generated_pdf_files
+            self._phase5_pdf_files = (generated_pdf_files, downloaded_pdf_files)
             
             if not all_pdf_files:
                 self.logger.warning("変換対象のPDFファイルがありません")
                 return {}
             
-            self.logger.info(f"PDF画像変換対象: {len(all_pdf_files)}ファイル")
-            for pdf_file in all_pdf_files:
-                self.logger.info(f"  - {pdf_file.name}")
+            # ファイル一覧は1レコードにまとめて出力
+            if self.logger.is_enabled_for(logging.INFO):
+                self.logger.info("PDF画像変換対象: %dファイル%s", len(all_pdf_files), self._format_file_names(all_pdf_files))
             
             # 画像出力ディレクトリを設定
             output_dir = self.dated_output_dir
             
-            # PDF画像変換を実行
-            converted_images = self.pdf_image_processor.process_all_pdfs(all_pdf_files, output_dir)
+            # PDF画像変換を実行（ダウンロードPDFが変換済みの場合は生成PDFのみ変換）
+            if downloaded_images is None:
+                converted_images = self.pdf_image_processor.process_all_pdfs(all_pdf_files, output_dir)
+            else:
+                converted_images = dict(downloaded_images)
+                if generated_pdf_files:
+                    converted_images.update(
+                        self.pdf_image_processor.process_all_pdfs(generated_pdf_files, output_dir)
+                    )
             
-            # 変換結果のサマリーを取得
+            # 変換結果のサマリーを取得（フェーズ6でも使用）
             summary = self.pdf_image_processor.get_image_summary(converted_images)
+            self._image_summary = summary
             
             self.logger.info("フェーズ5: PDF画像変換処理完了")
-            self.logger.info(f"  変換結果: {summary.get('総PDFファイル数', 0)}ファイル -> {summary.get('総画像数', 0)}枚")
-            self.logger.info(f"  成功: {summary.get('成功PDFファイル数', 0)}ファイル, 失敗: {summary.get('失敗PDFファイル数', 0)}ファイル")
+            self.logger.info("  変換結果: %dファイル -> %d枚", summary.get('総PDFファイル数', 0), summary.get('総画像数', 0))
+            self.logger.info("  成功: %dファイル, 失敗: %dファイル", summary.get('成功PDFファイル数', 0), summary.get('失敗PDFファイル数', 0))
             
             # 古い画像ファイルをクリーンアップ
             deleted_count = self.pdf_image_processor.cleanup_old_images(output_dir, days_to_keep=7)
             if deleted_count > 0:
-                self.logger.info(f"古い画像ファイルを削除: {deleted_count}個")
+                self.logger.info("古い画像ファイルを削除: %d個", deleted_count)
             
             return converted_images
             
         except Exception as e:
-            self.logger.error(f"フェーズ4.5でエラー: {str(e)}")
+            self.logger.error("フェーズ4.5でエラー: %s", e)
             return {}
     
     def _phase6_notification(self, validated_data, error_data, converted_images):
@@ -257,17 +326,27 @@ class DeliveryListProcessor:
         try:
             self.logger.info("フェーズ6: 統合通知処理開始")
             
-            # 生成されたファイルを取得
+            # 通知する内容がない場合はファイル走査・サマリー作成を省略
+            if not validated_data and not error_data and not converted_images:
+                self.logger.info("通知対象なし")
+                return
+            
+            # 生成されたファイルを取得（PDFはフェーズ5で取得済みならそれを使用）
             excel_files = self._get_generated_excel_files()
-            generated_pdf_files = self._get_generated_pdf_files()
-            downloaded_pdf_files = self._get_downloaded_pdf_files()
+            if self._phase5_pdf_files is not None:
+                generated_pdf_files, downloaded_pdf_files = self._phase5_pdf_files
+            else:
+                generated_pdf_files = self._get_generated_pdf_files()
+                downloaded_pdf_files = self._get_downloaded_pdf_files()
             
-            # 画像変換結果のサマリーを取得
-            image_summary = self.pdf_image_processor.get_image_summary(converted_images)
+            # 画像変換結果のサマリーを取得（フェーズ5で作成済みならそれを使用）
+            image_summary = self._image_summary
+            if image_summary is None:
+                image_summary = self.pdf_image_processor.get_image_summary(converted_images)
             
             # 処理結果のサマリーを作成
             summary = {
-                "処理日時": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "処理日時": self.run_timestamp,
                 "正常データ件数": len(validated_data),
                 "エラーデータ件数": len(error_data),
                 "生成Excelファイル数": len(excel_files),
@@ -279,81 +358,99 @@ class DeliveryListProcessor:
                 "画像変換失敗数": image_summary.get("失敗PDFファイル数", 0)
             }
             
+            # 重要なエラーがある場合のみ詳細通知を追加（統合通知と同じリクエストで送信）
+            send_error_details = bool(error_data) and len(error_data) > 5
+            if send_error_details:
+                self.logger.info("多数のエラーが発生したため詳細通知を送信")
+            
             # 統合されたビジネス向け通知を送信
             self.line_notifier.send_integrated_completion_notification(
                 summary=summary,
                 error_data=error_data,
                 converted_images=converted_images,
                 max_images=5,  # 重要な画像（出庫依頼書・配車表）を最大5枚まで送信
-                send_all_delivery_lists=True  # 全ての納品リスト画像を送信
+                send_all_delivery_lists=True,  # 全ての納品リスト画像を送信
+                include_error_details=send_error_details
             )
-            
-            # 重要なエラーがある場合のみ詳細通知を追加送信
-            if error_data and len(error_data) > 5:
-                self.logger.info("多数のエラーが発生したため詳細通知を送信")
-                self.line_notifier.send_error_details(error_data)
                 
         except Exception as e:
-            self.logger.error(f"フェーズ6でエラー: {str(e)}")
+            self.logger.error("フェーズ6でエラー: %s", e)
+    
+    @staticmethod
+    def _format_file_names(files):
+        """ログ出力用にファイル名を1行ずつ並べた文字列を作成"""
+        return "".join(f"\n  - {file.name}" for file in files)
+    
+    def _list_files(self, directory, suffix):
+        """ディレクトリ内の指定拡張子のファイルを最新順（ファイル名降順）で取得（キャッシュ付き）"""
+        cache_key = (directory, suffix)
+        files = self._file_list_cache.get(cache_key)
+        if files is None:
+            # scandirで1回走査し、名前で絞り込んでから一致したものだけPathを生成
+            names = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if os.path.normcase(entry.name).endswith(suffix) and entry.is_file():
+                            names.append(entry.name)
+            except FileNotFoundError:
+                pass
+            names.sort(reverse=True)
+            files = [directory / name for name in names]
+            self._file_list_cache[cache_key] = files
+        # 呼び出し側で連結・変更されてもキャッシュに影響しないよう複製を返す
+        return list(files)
     
     def _get_downloaded_pdf_files(self):
         """今日ダウンロードされたPDFファイルのリストを取得"""
         # 日付別ダウンロードディレクトリから取得
-        today_files = []
-        for pdf_file in self.dated_download_dir.glob("*.pdf"):
-            today_files.append(pdf_file)
+        today_files = self._list_files(self.dated_download_dir, ".pdf")
         
-        # ファイル名で並び替え（最新順）
-        today_files.sort(key=lambda x: x.name, reverse=True)
-        
-        self.logger.info(f"今日ダウンロードされたPDFファイル: {len(today_files)}個")
+        self.logger.info("今日ダウンロードされたPDFファイル: %d個", len(today_files))
         return today_files
     
     def _get_generated_excel_files(self):
         """今日生成されたExcelファイルのリストを取得"""
         # 日付別出力ディレクトリから取得
-        today_files = []
-        for excel_file in self.dated_output_dir.glob("*.xlsx"):
-            today_files.append(excel_file)
-        
-        # ファイル名で並び替え（最新順）
-        today_files.sort(key=lambda x: x.name, reverse=True)
+        today_files = self._list_files(self.dated_output_dir, ".xlsx")
         
-        self.logger.info(f"今日生成されたExcelファイル: {len(today_files)}個")
+        self.logger.info("今日生成されたExcelファイル: %d個", len(today_files))
         return today_files
     
     def _get_generated_pdf_files(self):
         """今日生成されたPDFファイルのリストを取得（最新の出庫依頼書と配車表のみ）"""
         # 日付別出力ディレクトリから取得
-        today_files = []
-        for pdf_file in self.dated_output_dir.glob("*.pdf"):
-            today_files.append(pdf_file)
-        
-        # ファイル名で並び替え（最新順）
-        today_files.sort(key=lambda x: x.name, reverse=True)
+        cache_key = (self.dated_output_dir, "latest_generated_pdfs")
+        filtered_files = self._file_list_cache.get(cache_key)
+        if filtered_files is None:
+            # 出庫依頼書と配車表の最新ファイル（ファイル名が最大のもの）のみを1回の走査で取得
+            latest_by_type = {}
+            try:
+                with os.scandir(self.dated_output_dir) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if not os.path.normcase(name).endswith(".pdf"):
+                            continue
+                        
+                        match = _PDF_TYPE_RE.search(name)
+                        if match is None:
+                            continue
+                        file_type = "出庫依頼" if match.group(1) else "配車表"
+                        
+                        if name > latest_by_type.get(file_type, "") and entry.is_file():
+                            latest_by_type[file_type] = name
+            except FileNotFoundError:
+                pass
+            
+            # ファイル名で並び替え（最新順）
+            filtered_files = [
+                self.dated_output_dir / name for name in sorted(latest_by_type.values(), reverse=True)
+            ]
+            self._file_list_cache[cache_key] = filtered_files
+        filtered_files = list(filtered_files)
         
-        # 出庫依頼書と配車表の最新ファイルのみを取得
-        filtered_files = []
-        found_types = set()
-        
-        for pdf_file in today_files:
-            file_type = None
-            if "出庫依頼" in pdf_file.name:
-                file_type = "出庫依頼"
-            elif any(keyword in pdf_file.name for keyword in ["アリスト", "配車", "LT"]):
-                file_type = "配車表"
-            
-            if file_type and file_type not in found_types:
-                filtered_files.append(pdf_file)
-                found_types.add(file_type)
-                
-            # 2種類とも見つかったら終了
-            if len(found_types) >= 2:
-                break
-        
-        self.logger.info(f"今日生成されたPDFファイル（フィルタ後）: {len(filtered_files)}個")
-        for pdf_file in filtered_files:
-            self.logger.info(f"  - {pdf_file.name}")
+        if self.logger.is_enabled_for(logging.INFO):
+            self.logger.info("今日生成されたPDFファイル（フィルタ後）: %d個%s", len(filtered_files), self._format_file_names(filtered_files))
         
         return filtered_files
     
@@ -362,32 +459,24 @@ class DeliveryListProcessor:
         try:
             self.logger.info("📭 データなし通知処理開始")
             
-            from datetime import datetime
-            from services.notification.line_bot import LineBotNotifier
-            
-            # LineBotNotifier初期化
-            line_bot = LineBotNotifier()
-            
-            # 今日の日付取得
-            today_str = datetime.today().strftime('%Y年%m月%d日')
-            
             # 専用メッセージ作成
-            message = f"📭 受注データ確認結果\n\n{today_str}の受注データが見つかりませんでした。"
+            message = f"📭 受注データ確認結果\n\n{self.today_display_str}の受注データが見つかりませんでした。"
             
             # LINE通知送信
-            self.logger.info(f"LINE通知送信: {message}")
-            line_bot.send_message(message)
+            self.logger.info("LINE通知送信: %s", message)
+            self.line_notifier.send_message(message)
             
             self.logger.info("✅ データなし通知を送信しました")
             
         except Exception as e:
-            self.logger.error(f"データなし通知送信エラー: {str(e)}")
+            self.logger.error("データなし通知送信エラー: %s", e)
             self.logger.exception(e)
     
     def _cleanup(self):
         """リソースのクリーンアップ"""
         if self.scraper:
             self.scraper.cleanup()
+        self.line_notifier.close()
 
 
 def main():
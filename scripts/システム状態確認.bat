@@ -18,11 +18,11 @@ echo ----------------------------------------
 py --version 2>nul
 IF ERRORLEVEL 1 (
     echo [ERROR] Python is not installed or not in PATH
-    echo Please install Python 3.9 or higher
+    echo Please install Python 3.10 or higher
 ) ELSE (
-    py --version | findstr /R "3\.[9-9]\|3\.1[0-9]" >nul
+    py --version | findstr /R "3\.1[0-9]" >nul
     IF ERRORLEVEL 1 (
-        echo [WARNING] Python 3.9 or higher is recommended
+        echo [WARNING] Python 3.10 or higher is recommended
     ) ELSE (
         echo [OK] Python version is compatible
     )
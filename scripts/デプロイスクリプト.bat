@@ -25,9 +25,9 @@ echo [1] Checking system requirements...
 echo ----------------------------------------
 
 REM Python check
-py --version 2>nul | findstr /R "3\.[9-9]\|3\.1[0-9]" >nul
+py --version 2>nul | findstr /R "3\.1[0-9]" >nul
 IF ERRORLEVEL 1 (
-    echo [ERROR] Python 3.9 or higher is required
+    echo [ERROR] Python 3.10 or higher is required
     echo Please install Python from https://www.python.org/
     pause
     EXIT /B 1
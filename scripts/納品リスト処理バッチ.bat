@@ -13,9 +13,9 @@ echo.
 
 REM ---------- Python Version Check ----------
 echo [%time%] Checking Python version...
-py --version 2>nul | findstr /R "3\.[9-9]\|3\.1[0-9]" >nul
+py --version 2>nul | findstr /R "3\.1[0-9]" >nul
 IF ERRORLEVEL 1 (
-    echo [ERROR] Python 3.9 or higher is required
+    echo [ERROR] Python 3.10 or higher is required
     py --version 2>nul
     pause
     EXIT /B 1
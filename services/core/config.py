@@ -229,8 +229,6 @@ class Config:
         
     def _should_enable_excel_app(self) -> bool:
         """Excel アプリケーションを使用するかどうかを判定（macOSでは無効化）"""
-        import platform
-        
         # 環境変数で強制的に有効/無効にできる
         force_enable = os.getenv('SMCL_FORCE_EXCEL_APP', '').lower() in ('true', '1', 'yes')
         force_disable = os.getenv('SMCL_DISABLE_EXCEL_APP', '').lower() in ('true', '1', 'yes')
@@ -253,8 +251,6 @@ class Config:
     
     def _get_pdf_output_method(self) -> str:
         """PDF出力方法を決定"""
-        import platform
-        
         # 環境変数で指定可能
         method = os.getenv('SMCL_PDF_METHOD', '').lower()
         if method in ['xlwings', 'weasyprint', 'html', 'native', 'libreoffice']:
@@ -283,8 +279,6 @@ class Config:
     
     def get_output_filename(self, file_type: str, destination: str = None, timestamp: bool = True) -> str:
         """出力ファイル名を生成"""
-        from datetime import datetime
-        
         base_name = file_type
         if destination:
             base_name += f"_{destination}"
@@ -81,6 +81,10 @@ class Logger:
         
         return self._loggers[name]
     
+    def is_enabled_for(self, level: int) -> bool:
+        """指定レベルのログが出力されるかどうかを確認"""
+        return self.logger.isEnabledFor(level)
+    
     def debug(self, message: str, *args, **kwargs):
         """デバッグレベルのログを出力"""
         self.logger.debug(message, *args, **kwargs)
@@ -74,7 +74,7 @@ class DeliveryDocument:
         return sum(item.quantity for item in self.items)
 
 
-@dataclass
+@dataclass(slots=True)
 class MasterItem:
     """マスタアイテムのデータクラス"""
     item_code: str = ""
@@ -91,7 +91,7 @@ class MasterItem:
             self.delivery_destinations = []
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationError:
     """バリデーションエラーのデータクラス"""
     error_type: str = ""
@@ -87,24 +87,22 @@ class PDFToImageConverter:
             image_paths = []
             base_name = pdf_path.stem
             
+            # 拡張子と保存オプションはページに依存しないためループ外で一度だけ決定
+            format_upper = format.upper()
+            ext = '.png' if format_upper == 'PNG' else '.jpg'
+            if format_upper == 'JPEG':
+                # JPEGの場合は品質設定を適用
+                save_options = {'quality': quality, 'optimize': True}
+            else:
+                save_options = {}
+            
             for i, image in enumerate(images, 1):
                 # ファイル名を生成
-                if format.upper() == 'JPEG':
-                    ext = '.jpg'
-                elif format.upper() == 'PNG':
-                    ext = '.png'
-                else:
-                    ext = '.jpg'  # デフォルト
-                
                 image_filename = f"{base_name}_page_{i:02d}{ext}"
                 image_path = output_dir / image_filename
                 
                 # 画像を保存
-                if format.upper() == 'JPEG':
-                    # JPEGの場合は品質設定を適用
-                    image.save(image_path, format, quality=quality, optimize=True)
-                else:
-                    image.save(image_path, format)
+                image.save(image_path, format, **save_options)
                 
                 image_paths.append(image_path)
                 self.logger.info(f"画像生成完了: {image_filename}")
@@ -164,15 +162,17 @@ class PDFToImageConverter:
             # 画像をBase64に変換
             base64_images = []
             
+            # 保存オプションはページに依存しないためループ外で一度だけ決定
+            if format.upper() == 'JPEG':
+                save_options = {'format': 'JPEG', 'quality': quality, 'optimize': True}
+            else:
+                save_options = {'format': format}
+            
             for i, image in enumerate(images, 1):
                 try:
                     # メモリ上で画像をエンコード
                     buffer = io.BytesIO()
-                    
-                    if format.upper() == 'JPEG':
-                        image.save(buffer, format='JPEG', quality=quality, optimize=True)
-                    else:
-                        image.save(buffer, format=format)
+                    image.save(buffer, **save_options)
                     
                     # Base64エンコード
                     buffer.seek(0)
@@ -207,10 +207,9 @@ class PDFToImageConverter:
         
         try:
             import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            doc.close()
-            return page_count
+            # ページ数はドキュメントのメタ情報から取得（例外時も確実にクローズ）
+            with fitz.open(pdf_path) as doc:
+                return doc.page_count
         except ImportError:
             # PyMuPDFがない場合はpdf2imageで確認
             try:
@@ -242,3 +241,8 @@ class PDFToImageConverter:
             'quality': 80,  # バランスの取れた品質
             'max_pages': 3  # LINE送信を考慮したページ数制限
         }
+
+
+def convert_pdf_to_images_worker(pdf_path: Path, output_dir: Path, settings: dict) -> List[Path]:
+    """プロセスプール用の1ファイルPDF画像変換（data_processingパッケージを読み込まない軽量なモジュール関数）"""
+    return PDFToImageConverter().convert_pdf_to_images(pdf_path=pdf_path, output_dir=output_dir, **settings)
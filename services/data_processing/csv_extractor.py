@@ -4,6 +4,8 @@
 CSV データ抽出モジュール
 """
 
+import os
+import re
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -18,6 +20,19 @@ try:
 except ImportError:
     chardet = None
 
+# 受注伝票CSVのファイル名接頭辞（例: 受注伝票_20250815123456.csv）
+_ORDER_CSV_PREFIX = "受注伝票_"
+_CSV_SUFFIXES = (".csv", ".CSV")
+
+# ファイル名中の日付（例: 20250806）
+_FILENAME_DATE_RE = re.compile(r'(\d{8})')
+
+# 数値文字列の正規化表（全角数字→半角、カンマ・空白は除去）
+_NUM_TRANS = str.maketrans({
+    **{chr(ord('０') + i): str(i) for i in range(10)},
+    ',': None, '，': None, ' ': None, '\t': None, '\u3000': None, '\n': None
+})
+
 
 class CSVExtractor:
     """CSV データ抽出クラス"""
@@ -65,6 +80,10 @@ class CSVExtractor:
             if warehouse_col is not None:
                 group_cols.append(warehouse_col)
             
+            # 数量が文字列として読み込まれた場合（"1,200"や全角数字）は数値に正規化
+            if not pd.api.types.is_numeric_dtype(df[quantity_col]):
+                df[quantity_col] = self._parse_number_column(df[quantity_col])
+            
             grouped = df.groupby(group_cols)[quantity_col].sum().reset_index()
             
             # DeliveryDocumentとDeliveryItemを作成
@@ -222,18 +241,32 @@ class CSVExtractor:
             self.logger.error(f"列検索エラー: {str(e)}")
             return None
     
+    def _parse_number_column(self, column: pd.Series) -> pd.Series:
+        """文字列の数値列をカンマ・全角数字を除去・変換して数値化（変換不可は警告して0）"""
+        cleaned = column.map(lambda value: value.translate(_NUM_TRANS) if isinstance(value, str) else value)
+        parsed = pd.to_numeric(cleaned, errors='coerce')
+        
+        # 値があるのに数値化できなかった行（"12個"など）は黙って捨てずに警告する
+        invalid = parsed.isna() & column.notna() & (column.astype(str).str.strip() != '')
+        for index, value in column[invalid].items():
+            self.logger.warning(f"数量を数値に変換できないため0として扱います: 行{index} 値={value!r}")
+        
+        return parsed.fillna(0)
+    
     def _extract_date_from_filename(self, csv_path: Path) -> str:
         """ファイル名から日付を抽出"""
         try:
             filename = csv_path.stem
             
-            # 日付パターンを検索（例: 20250806）
-            import re
-            date_pattern = r'(\d{8})'
-            date_match = re.search(date_pattern, filename)
+            # 標準のファイル名（受注伝票_YYYYMMDDhhmmss）は固定位置の切り出しで判定
+            date_str = filename[len(_ORDER_CSV_PREFIX):len(_ORDER_CSV_PREFIX) + 8]
+            if not (filename.startswith(_ORDER_CSV_PREFIX) and len(date_str) == 8
+                    and date_str.isascii() and date_str.isdigit()):
+                # それ以外は日付パターンを検索（例: 20250806）
+                date_match = _FILENAME_DATE_RE.search(filename)
+                date_str = date_match.group(1) if date_match else None
             
-            if date_match:
-                date_str = date_match.group(1)
+            if date_str:
                 # 日付をフォーマット
                 formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
                 return formatted_date
@@ -284,17 +317,26 @@ class CSVExtractor:
             
             self.logger.info(f"今日の日付({today_str})の最新伝票を検索中: {pattern}")
             
-            csv_files = list(directory.glob(pattern))
-            
-            if not csv_files:
+            # scandirで1回走査し、ファイル名の時刻部分が最大のもの（最新）を選択
+            # ファイル名例: 受注伝票_20250815123456.csv（拡張子の大文字・小文字は問わない）
+            prefix = f"{_ORDER_CSV_PREFIX}{today_str}"
+            latest_name = None
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if not (name.startswith(prefix) and name.endswith(_CSV_SUFFIXES)):
+                            continue
+                        if (latest_name is None or name[:-4] > latest_name[:-4]) and entry.is_file():
+                            latest_name = name
+            except FileNotFoundError:
+                pass
+            
+            if latest_name is None:
                 self.logger.warning(f"今日の日付のCSVファイルが見つかりません: {pattern}")
                 return None
             
-            # ファイル名の時刻部分で並び替え（最新順）
-            # ファイル名例: 受注伝票_20250815123456.csv
-            csv_files.sort(key=lambda x: x.stem, reverse=True)
-            
-            latest_file = csv_files[0]
+            latest_file = directory / latest_name
             self.logger.info(f"今日の日付の最も新しい伝票を発見: {latest_file}")
             
             return latest_file
@@ -323,4 +365,4 @@ class CSVExtractor:
             
         except Exception as e:
             self.logger.error(f"複数CSV抽出エラー: {str(e)}")
-            return []
\ No newline at end of file
+            return []
@@ -4,22 +4,97 @@
 Excel 処理モジュール
 """
 
+import os
+import re
+import shutil
+import platform
+import subprocess
+import tempfile
+import traceback
+import zipfile
+import xml.etree.ElementTree as ET
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Any
 from copy import copy
+from contextlib import contextmanager
+from functools import lru_cache
 
 try:
     import openpyxl
     from openpyxl import Workbook, load_workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+    from openpyxl.utils import get_column_letter, column_index_from_string, range_boundaries
 except ImportError:
     openpyxl = None
 
+try:
+    import xlwings as xw
+except ImportError:
+    xw = None
+
+try:
+    from weasyprint import HTML, CSS
+    from weasyprint.text.fonts import FontConfiguration
+except (ImportError, OSError):
+    HTML = CSS = FontConfiguration = None
+
+# 値のみの読み込みはRust実装のcalamineを優先（pandas 2.2以降で対応）
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_READ_ENGINE = "calamine" if tuple(int(v) for v in pd.__version__.split(".")[:2]) >= (2, 2) else None
+except ImportError:
+    _EXCEL_READ_ENGINE = None
+
+from ..core.config import Config
 from ..core.logger import Logger
 from ..core.models import DeliveryDocument, DeliveryItem, MasterItem, ValidationError
 
+# ファイル名に使用できない文字
+_FILENAME_SANITIZE_RE = re.compile(r'[<>:"/\\|?*]')
+
+
+# HTML出力時のエスケープ表（セル値・シート名用）
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+# HTMLテーブルのセル・属性テンプレート
+_TD_TEMPLATE = '<td%s>%s</td>'
+_ROWSPAN_ATTR = ' rowspan="%d"'
+_COLSPAN_ATTR = ' colspan="%d"'
+_CLASS_ATTR = ' class="%s"'
+
+# pandasフォールバック用のHTMLテンプレート
+_PANDAS_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{sheet_name}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        table {{ border-collapse: collapse; width: 100%; }}
+        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        th {{ background-color: #f2f2f2; }}
+        h1 {{ color: #333; }}
+    </style>
+</head>
+<body>
+    <h1>{sheet_name}</h1>
+    {table}
+</body>
+</html>
+"""
+
+# xlsx内部XMLの名前空間
+_XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_XLSX_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_XLSX_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# 数量を挿入する出庫依頼書シート名
+HOUSUI_SHEET_NAME = "ホウスイ川島出庫依頼書"
+ARIST_SHEET_NAME = "アリスト鶴ヶ島 (LT1)"
+
 
 class ExcelProcessor:
     """Excel 処理クラス"""
@@ -28,6 +103,19 @@ class ExcelProcessor:
         self.logger = Logger(__name__)
         self.master_data: Dict[str, MasterItem] = {}
         self.config = config
+        # 出力先などの参照用設定（未指定時も一度だけ生成して使い回す）
+        self._config = config if config is not None else Config()
+        # 印刷スケールごとのPDF用CSS（WeasyPrintのCSS解析は一度だけ）
+        self._pdf_css_cache: Dict[int, Any] = {}
+        # WeasyPrintのフォント設定と画像等のキャッシュ（シート間で共有）
+        self._font_config = None
+        self._weasyprint_cache: Dict[str, Any] = {}
+        # (シートID, 列番号) → {商品コード: 行番号} の検索インデックス
+        self._code_index_cache: Dict[Tuple[int, int], Dict[str, int]] = {}
+        # シートID → {(行, 列): マージ範囲(min_row, min_col, max_row, max_col)}
+        self._merge_index: Dict[int, Dict[Tuple[int, int], Tuple[int, int, int, int]]] = {}
+        # PDF出力用に読み込んだワークブック（パス・更新時刻・サイズをキーに再利用）
+        self._wb_cache: Dict[Tuple[str, int, int], Any] = {}
         
         if not openpyxl:
             raise ImportError("openpyxl がインストールされていません。pip install openpyxl を実行してください。")
@@ -42,7 +130,7 @@ class ExcelProcessor:
                 return False
             
             # 「登録商品マスター」シートを読み込み
-            df = pd.read_excel(master_file_path, sheet_name='登録商品マスター')
+            df = pd.read_excel(master_file_path, sheet_name='登録商品マスター', engine=_EXCEL_READ_ENGINE)
             
             # カラム名を正規化
             df.columns = [str(col).strip() for col in df.columns]
@@ -73,7 +161,6 @@ class ExcelProcessor:
             
         except Exception as e:
             self.logger.error(f"マスタファイル読み込みエラー: {str(e)}")
-            import traceback
             traceback.print_exc()
             return False
     
@@ -189,9 +276,7 @@ class ExcelProcessor:
     
     def _find_master_item_by_code(self, item_code: str) -> Optional[MasterItem]:
         """商品コードでマスタデータから商品を検索"""
-        if item_code in self.master_data:
-            return self.master_data[item_code]
-        return None
+        return self.master_data.get(item_code)
     
     def _find_master_item(self, item_name: str) -> Optional[MasterItem]:
         """マスタデータから商品を検索（商品名ベース・従来互換）"""
@@ -257,9 +342,10 @@ class ExcelProcessor:
                 cell.font = Font(bold=True)
                 cell.fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
             
-            # エラーデータを書き込み
+            # エラーデータを書き込み（発生日時は一括書き込み時刻で統一）
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             for row, error in enumerate(errors, 2):
-                ws.cell(row=row, column=1, value=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                ws.cell(row=row, column=1, value=timestamp)
                 ws.cell(row=row, column=2, value=error.error_type)
                 ws.cell(row=row, column=3, value=error.actual_value)  # 商品コード
                 ws.cell(row=row, column=4, value=error.item_name)
@@ -267,30 +353,7 @@ class ExcelProcessor:
                 ws.cell(row=row, column=6, value=error.document_id)
             
             # 列幅調整
-            for column in ws.columns:
-                max_length = 0
-                column_letter = None
-                
-                # マージされたセルに対応した列文字の取得
-                for cell in column:
-                    if hasattr(cell, 'column_letter'):
-                        column_letter = cell.column_letter
-                        break
-                
-                # column_letterが取得できない場合はスキップ
-                if not column_letter:
-                    continue
-                
-                for cell in column:
-                    try:
-                        if hasattr(cell, 'value') and cell.value is not None:
-                            cell_length = len(str(cell.value))
-                            if cell_length > max_length:
-                                max_length = cell_length
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
+            self._adjust_column_widths(ws)
             
             # ファイル保存
             wb.save(master_file_path)
@@ -301,7 +364,6 @@ class ExcelProcessor:
             
         except Exception as e:
             self.logger.error(f"エラーリストシート書き込みエラー: {str(e)}")
-            import traceback
             traceback.print_exc()
             return False
     
@@ -315,60 +377,51 @@ class ExcelProcessor:
                 return None
             
             # 出力ディレクトリを取得
-            from ..core.config import Config
-            config = Config()
+            config = self._config
             
             # ファイル名生成
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             error_file = config.output_dir / f"エラーデータ_{timestamp}.xlsx"
             
-            # ワークブック作成
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "エラーデータ"
+            # 新規ファイルのため書き込み専用モードで作成（行を逐次書き出しメモリを抑える）
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("エラーデータ")
             
-            # ヘッダー作成
             headers = ["エラー種別", "商品名", "期待値", "実際値", "説明", "文書ID", "発生日時"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
             
-            # データ行作成
-            for row, error in enumerate(errors, 2):
-                ws.cell(row=row, column=1, value=error.error_type)
-                ws.cell(row=row, column=2, value=error.item_name)
-                ws.cell(row=row, column=3, value=error.expected_value)
-                ws.cell(row=row, column=4, value=error.actual_value)
-                ws.cell(row=row, column=5, value=error.description)
-                ws.cell(row=row, column=6, value=error.document_id)
-                ws.cell(row=row, column=7, value=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            # データ行作成（発生日時は一括書き込み時刻で統一）
+            created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            rows = [
+                [
+                    error.error_type,
+                    error.item_name,
+                    error.expected_value,
+                    error.actual_value,
+                    error.description,
+                    error.document_id,
+                    created_at,
+                ]
+                for error in errors
+            ]
             
-            # 列幅調整
-            for column in ws.columns:
-                max_length = 0
-                column_letter = None
-                
-                # マージされたセルに対応した列文字の取得
-                for cell in column:
-                    if hasattr(cell, 'column_letter'):
-                        column_letter = cell.column_letter
-                        break
-                
-                # column_letterが取得できない場合はスキップ
-                if not column_letter:
-                    continue
-                
-                for cell in column:
-                    try:
-                        if hasattr(cell, 'value') and cell.value is not None:
-                            cell_length = len(str(cell.value))
-                            if cell_length > max_length:
-                                max_length = cell_length
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
+            # 列幅調整（書き込み専用モードでは行の書き込み前に設定する必要がある）
+            for col_idx, values in enumerate(zip(headers, *rows), 1):
+                max_length = max((len(str(value)) for value in values if value is not None), default=0)
+                ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 50)
+            
+            # ヘッダー作成
+            header_font = Font(bold=True)
+            header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(ws, value=header)
+                cell.font = header_font
+                cell.fill = header_fill
+                header_cells.append(cell)
+            ws.append(header_cells)
+            
+            for row in rows:
+                ws.append(row)
             
             # ファイル保存
             wb.save(error_file)
@@ -407,8 +460,7 @@ class ExcelProcessor:
         try:
             self.logger.info(f"配車表作成開始: {destination}")
             
-            from ..core.config import Config
-            config = Config()
+            config = self._config
             
             # ファイル名生成
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -468,8 +520,7 @@ class ExcelProcessor:
         try:
             self.logger.info(f"出庫依頼書作成開始: {destination}")
             
-            from ..core.config import Config
-            config = Config()
+            config = self._config
             
             # ファイル名生成
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -540,8 +591,7 @@ class ExcelProcessor:
     
     def _sanitize_filename(self, filename: str) -> str:
         """ファイル名に使用できない文字を除去"""
-        import re
-        return re.sub(r'[<>:"/\\|?*]', '_', filename)
+        return _sanitize_name(filename)
     
     def _apply_table_formatting(self, ws, start_row: int, end_row: int, num_cols: int):
         """テーブルに罫線とフォーマットを適用"""
@@ -558,32 +608,11 @@ class ExcelProcessor:
     
     def _adjust_column_widths(self, ws):
         """列幅を自動調整"""
-        for column in ws.columns:
-            max_length = 0
-            column_letter = None
-            
-            # マージされたセルに対応した列文字の取得
-            for cell in column:
-                # マージされたセルでない最初のセルから列文字を取得
-                if hasattr(cell, 'column_letter'):
-                    column_letter = cell.column_letter
-                    break
-            
-            # column_letterが取得できない場合はスキップ
-            if not column_letter:
-                continue
-            
-            for cell in column:
-                try:
-                    if hasattr(cell, 'value') and cell.value is not None:
-                        cell_length = len(str(cell.value))
-                        if cell_length > max_length:
-                            max_length = cell_length
-                except:
-                    pass
-            
+        # 列番号から列文字を直接求めるため、マージされたセルの判定は不要
+        for col_idx, values in enumerate(ws.iter_cols(values_only=True), 1):
+            max_length = max((len(str(value)) for value in values if value is not None), default=0)
             adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
     
     def process_warehouse_orders(self, validated_data: List[DeliveryDocument], master_file_path: Path) -> bool:
         """倉庫別注文処理 - 要求された仕様に従って既存Excelに数量を挿入"""
@@ -602,27 +631,49 @@ class ExcelProcessor:
                 self.logger.error("登録商品マスタの読み込みに失敗しました")
                 return False
             
+            # 前回実行時のシートに紐づく検索インデックスを破棄
+            self._code_index_cache.clear()
+            self._merge_index.clear()
+            
+            # 数量挿入先シートはループ前に一度だけ取得
+            sheetset = set(wb.sheetnames)
+            housui_ws = wb[HOUSUI_SHEET_NAME] if HOUSUI_SHEET_NAME in sheetset else None
+            arist_ws = wb[ARIST_SHEET_NAME] if ARIST_SHEET_NAME in sheetset else None
+            if housui_ws is None:
+                self.logger.warning(f"{HOUSUI_SHEET_NAME}シートが見つかりません")
+            if arist_ws is None:
+                self.logger.warning(f"{ARIST_SHEET_NAME}シートが見つかりません")
+            
             # すべての注文アイテムを処理
             for document in validated_data:
                 for item in document.items:
                     # 1. 登録商品マスタと突合
-                    if item.item_code not in self.master_data:
+                    master_item = self.master_data.get(item.item_code)
+                    if master_item is None:
                         self.logger.warning(f"商品コード {item.item_code} がマスタに見つかりません")
                         continue
                     
                     # 2. C列の倉庫名を確認（ここでは商品のdelivery_destinationを使用）
-                    warehouse = self._determine_warehouse(item, document)
+                    warehouse = self._determine_warehouse(item, document, master_item)
                     
                     if warehouse == "ホウスイ":
-                        self._process_housui_order(wb, item)
+                        self._process_housui_order(housui_ws, arist_ws, item)
                     elif warehouse == "アリスト":
-                        self._process_arist_order(wb, item)
+                        self._process_arist_order(arist_ws, item)
                     else:
                         self.logger.warning(f"未知の倉庫名: {warehouse}")
             
-            # outputディレクトリに結果ファイルを保存
+            # 一時ファイルに保存してから置き換え（失敗時に書きかけのファイルを出力先に残さない）
             output_file = self._create_output_filename(master_file_path)
-            wb.save(output_file)
+            temp_output_file = output_file.with_name(f".{output_file.name}.tmp")
+            try:
+                wb.save(temp_output_file)
+                os.replace(temp_output_file, output_file)
+            finally:
+                if temp_output_file.exists():
+                    temp_output_file.unlink()
+            self._code_index_cache.clear()
+            self._merge_index.clear()
             self.logger.info(f"倉庫別注文処理完了: {output_file}")
             
             # PDF出力を実行
@@ -634,8 +685,12 @@ class ExcelProcessor:
             self.logger.error(f"倉庫別注文処理エラー: {str(e)}")
             return False
     
-    def _determine_warehouse(self, item: DeliveryItem, document: DeliveryDocument) -> str:
-        """倉庫名を判定"""
+    def _determine_warehouse(self, item: DeliveryItem, document: DeliveryDocument,
+                             master_item: Optional[MasterItem] = None) -> str:
+        """倉庫名を判定（突合済みのマスタアイテムがあれば再検索しない）"""
+        if master_item is None:
+            master_item = self.master_data.get(item.item_code)
+        
         # DeliveryItemの倉庫名フィールドを最優先で使用
         if item.warehouse:
             warehouse = item.warehouse.strip()
@@ -646,7 +701,7 @@ class ExcelProcessor:
                 return "アリスト"
             else:
                 # 数値コードの場合は、マスタExcelの倉庫名列を確認
-                warehouse_from_master = self._get_warehouse_from_master(item.item_code)
+                warehouse_from_master = self._normalize_master_warehouse(master_item)
                 if warehouse_from_master:
                     return warehouse_from_master
                 
@@ -655,7 +710,7 @@ class ExcelProcessor:
                 return "ホウスイ"
         
         # 倉庫名が設定されていない場合は、マスタから取得を試行
-        warehouse_from_master = self._get_warehouse_from_master(item.item_code)
+        warehouse_from_master = self._normalize_master_warehouse(master_item)
         if warehouse_from_master:
             return warehouse_from_master
         
@@ -671,33 +726,33 @@ class ExcelProcessor:
     
     def _get_warehouse_from_master(self, item_code: str) -> Optional[str]:
         """マスタから商品の倉庫名を取得"""
+        return self._normalize_master_warehouse(self.master_data.get(item_code))
+    
+    def _normalize_master_warehouse(self, master_item: Optional[MasterItem]) -> Optional[str]:
+        """マスタアイテムの倉庫名を正規化"""
         try:
-            if item_code in self.master_data:
-                warehouse = self.master_data[item_code].warehouse
-                if warehouse:
-                    # 倉庫名の正規化
-                    if "ホウスイ" in warehouse or "豊水" in warehouse:
-                        return "ホウスイ"
-                    elif "アリスト" in warehouse:
-                        return "アリスト"
-                    else:
-                        self.logger.debug(f"マスタの倉庫名を正規化: {warehouse}")
-                        return "ホウスイ"  # デフォルト
+            if master_item is not None and master_item.warehouse:
+                warehouse = master_item.warehouse
+                # 倉庫名の正規化
+                if "ホウスイ" in warehouse or "豊水" in warehouse:
+                    return "ホウスイ"
+                elif "アリスト" in warehouse:
+                    return "アリスト"
+                else:
+                    self.logger.debug(f"マスタの倉庫名を正規化: {warehouse}")
+                    return "ホウスイ"  # デフォルト
         except Exception as e:
             self.logger.debug(f"マスタから倉庫名取得エラー: {str(e)}")
         
         return None
     
-    def _process_housui_order(self, wb, item: DeliveryItem):
+    def _process_housui_order(self, housui_sheet, arist_sheet, item: DeliveryItem):
         """ホウスイの場合の処理"""
         try:
-            # 3. ホウスイ川島出庫依頼書シートを開く
-            if "ホウスイ川島出庫依頼書" not in wb.sheetnames:
-                self.logger.warning("ホウスイ川島出庫依頼書シートが見つかりません")
+            # 3. ホウスイ川島出庫依頼書シート（存在しない場合はNone）
+            if housui_sheet is None:
                 return
             
-            housui_sheet = wb["ホウスイ川島出庫依頼書"]
-            
             # 4. A列をみて商品コードが合致する行を取得
             housui_row = self._find_row_by_product_code(housui_sheet, "A", item.item_code)
             if housui_row:
@@ -705,13 +760,10 @@ class ExcelProcessor:
                 self._safe_cell_insert(housui_sheet, housui_row, 28, item.quantity)  # AB列のみ
                 self.logger.info(f"ホウスイ川島出庫依頼書のAB列に数量挿入: 行{housui_row}, 数量{item.quantity}")
             
-            # 6. アリスト鶴ヶ島 (LT1)を開く
-            if "アリスト鶴ヶ島 (LT1)" not in wb.sheetnames:
-                self.logger.warning("アリスト鶴ヶ島 (LT1)シートが見つかりません")
+            # 6. アリスト鶴ヶ島 (LT1)シート（存在しない場合はNone）
+            if arist_sheet is None:
                 return
             
-            arist_sheet = wb["アリスト鶴ヶ島 (LT1)"]
-            
             # 7. O列をみて商品コードが合致する行を取得
             arist_row = self._find_row_by_product_code(arist_sheet, "O", item.item_code)
             if arist_row:
@@ -722,16 +774,13 @@ class ExcelProcessor:
         except Exception as e:
             self.logger.error(f"ホウスイ注文処理エラー: {str(e)}")
     
-    def _process_arist_order(self, wb, item: DeliveryItem):
+    def _process_arist_order(self, arist_sheet, item: DeliveryItem):
         """アリストの場合の処理"""
         try:
-            # 3. アリスト鶴ヶ島 (LT1)を開く
-            if "アリスト鶴ヶ島 (LT1)" not in wb.sheetnames:
-                self.logger.warning("アリスト鶴ヶ島 (LT1)シートが見つかりません")
+            # 3. アリスト鶴ヶ島 (LT1)シート（存在しない場合はNone）
+            if arist_sheet is None:
                 return
             
-            arist_sheet = wb["アリスト鶴ヶ島 (LT1)"]
-            
             # 4. O列をみて商品コードが合致する行を取得
             arist_row = self._find_row_by_product_code(arist_sheet, "O", item.item_code)
             if arist_row:
@@ -745,19 +794,13 @@ class ExcelProcessor:
     def _find_row_by_product_code(self, worksheet, column_letter: str, product_code: str) -> Optional[int]:
         """指定された列で商品コードが合致する行を検索"""
         try:
-            # 列をA=1, B=2, ... に変換
-            column_index = ord(column_letter.upper()) - ord('A') + 1
-            
-            # 最大行数を取得
-            max_row = worksheet.max_row
+            # 列をA=1, B=2, ..., AA=27 ... に変換（openpyxl内部の変換表を利用）
+            column_index = column_index_from_string(column_letter.upper())
             
-            for row in range(1, max_row + 1):
-                cell_value = worksheet.cell(row=row, column=column_index).value
-                if cell_value is not None:
-                    # 数値型の場合は文字列に変換して比較
-                    cell_str = str(int(cell_value)) if isinstance(cell_value, (int, float)) else str(cell_value)
-                    if cell_str == str(product_code):
-                        return row
+            code_index = self._get_code_index(worksheet, column_index)
+            row = code_index.get(str(product_code).strip())
+            if row is not None:
+                return row
             
             self.logger.warning(f"商品コード {product_code} が{column_letter}列に見つかりませんでした")
             return None
@@ -766,32 +809,45 @@ class ExcelProcessor:
             self.logger.error(f"商品コード検索エラー: {str(e)}")
             return None
     
+    def _get_code_index(self, worksheet, column_index: int) -> Dict[str, int]:
+        """商品コード列の検索インデックスを取得（シート・列ごとに一度だけ構築）"""
+        cache_key = (id(worksheet), column_index)
+        code_index = self._code_index_cache.get(cache_key)
+        if code_index is not None:
+            return code_index
+        
+        code_index = {}
+        # 対象列のみを値で走査（Cellオブジェクトの生成を避ける）
+        column_values = worksheet.iter_rows(min_col=column_index, max_col=column_index, values_only=True)
+        for row, (cell_value,) in enumerate(column_values, start=1):
+            if cell_value is None:
+                continue
+            # 数値型の場合は整数の文字列に、文字列は前後の空白を除いて正規化
+            value_type = type(cell_value)
+            cell_str = str(int(cell_value)) if value_type is int or value_type is float else str(cell_value).strip()
+            # 重複コードは従来どおり先頭の行を優先
+            code_index.setdefault(cell_str, row)
+        
+        self._code_index_cache[cache_key] = code_index
+        return code_index
+    
     def _safe_cell_insert(self, worksheet, row: int, column: int, value):
         """マージされたセルに安全に値を挿入（マージ構造を保持）"""
         try:
-            cell = worksheet.cell(row=row, column=column)
-            cell_coordinate = cell.coordinate
-            
             # マージされたセルかチェック
-            merged_cell_found = False
-            for merged_range in worksheet.merged_cells.ranges:
-                if cell_coordinate in merged_range:
-                    # マージされたセルの場合、左上のセル（トップレフト）に値を設定
-                    top_left_cell = worksheet.cell(merged_range.min_row, merged_range.min_col)
-                    top_left_cell.value = value
-                    merged_cell_found = True
-                    break
-            
-            # 通常のセル（マージされていない）の場合
-            if not merged_cell_found:
-                cell.value = value
+            merged_bounds = self._get_merge_index(worksheet).get((row, column))
+            if merged_bounds:
+                # マージされたセルの場合、左上のセル（トップレフト）に値を設定
+                worksheet.cell(merged_bounds[0], merged_bounds[1]).value = value
+            else:
+                # 通常のセル（マージされていない）の場合
+                worksheet.cell(row=row, column=column).value = value
             
         except Exception as e:
             self.logger.warning(f"セル挿入エラー (行{row}, 列{column}): {str(e)}")
             # フォールバック: 強制的に値を設定
             try:
                 # 直接セルアクセスで値を設定
-                from openpyxl.utils import get_column_letter
                 col_letter = get_column_letter(column)
                 worksheet[f"{col_letter}{row}"] = value
             except Exception as e2:
@@ -800,24 +856,37 @@ class ExcelProcessor:
     def _is_cells_merged(self, worksheet, row1: int, col1: int, row2: int, col2: int) -> bool:
         """指定された2つのセルが同じマージ範囲に含まれているかチェック"""
         try:
-            cell1_coordinate = worksheet.cell(row1, col1).coordinate
-            cell2_coordinate = worksheet.cell(row2, col2).coordinate
-            
-            for merged_range in worksheet.merged_cells.ranges:
-                if cell1_coordinate in merged_range and cell2_coordinate in merged_range:
-                    return True
-            
-            return False
+            merge_index = self._get_merge_index(worksheet)
+            merged_bounds = merge_index.get((row1, col1))
+            return merged_bounds is not None and merged_bounds == merge_index.get((row2, col2))
             
         except Exception as e:
             self.logger.debug(f"マージセルチェックエラー: {str(e)}")
             return False
     
+    def _get_merge_index(self, worksheet) -> Dict[Tuple[int, int], Tuple[int, int, int, int]]:
+        """シートのマージセル索引を取得（シートごとに一度だけ構築）"""
+        merge_index = self._merge_index.get(id(worksheet))
+        if merge_index is None:
+            merge_index = self._build_merge_index(worksheet)
+            self._merge_index[id(worksheet)] = merge_index
+        return merge_index
+    
+    @staticmethod
+    def _build_merge_index(worksheet) -> Dict[Tuple[int, int], Tuple[int, int, int, int]]:
+        """マージ範囲に含まれる全セルからその範囲への索引を構築"""
+        merge_index = {}
+        for merged_range in worksheet.merged_cells.ranges:
+            bounds = (merged_range.min_row, merged_range.min_col, merged_range.max_row, merged_range.max_col)
+            for row in range(merged_range.min_row, merged_range.max_row + 1):
+                for col in range(merged_range.min_col, merged_range.max_col + 1):
+                    merge_index[(row, col)] = bounds
+        return merge_index
+    
     def _create_output_filename(self, master_file_path: Path) -> Path:
         """outputディレクトリにファイル名を生成"""
         try:
-            from ..core.config import Config
-            config = Config()
+            config = self._config
             
             # タイムスタンプを作成
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -848,64 +917,131 @@ class ExcelProcessor:
                 today_str = datetime.now().strftime(config.date_folder_format)
                 output_dir = config.get_dated_output_dir(today_str)
             else:
-                # フォールバック: 新しいConfigインスタンスを作成
-                from ..core.config import Config
-                config = Config()
+                # フォールバック: 既定の設定を使用
+                config = self._config
                 output_dir = config.output_dir
                 
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
+            # PDFファイル名を生成
+            export_targets = []
             for sheet_name in sheet_names:
-                try:
-                    # PDFファイル名を生成
-                    safe_sheet_name = self._sanitize_filename(sheet_name)
-                    pdf_filename = f"{safe_sheet_name}_{timestamp}.pdf"
-                    pdf_path = output_dir / pdf_filename
-                    
-                    # アリスト配車表の場合は専用メソッドを使用
-                    if "アリスト" in sheet_name or "LT" in sheet_name:
-                        self.logger.info(f"🚛 アリスト配車表を検出: {sheet_name}")
-                        success = self._export_sheet_to_pdf_aristot_optimized(excel_file_path, sheet_name, pdf_path)
-                    else:
-                        # 通常のPDF出力
-                        success = self._export_sheet_to_pdf_xlwings(excel_file_path, sheet_name, pdf_path)
-                    
-                    if success:
-                        pdf_files.append(pdf_path)
-                        self.logger.info(f"PDF出力成功: {sheet_name} -> {pdf_path}")
-                    else:
-                        self.logger.warning(f"PDF出力失敗: {sheet_name}")
-                        
-                except Exception as e:
-                    self.logger.error(f"シート '{sheet_name}' のPDF出力エラー: {str(e)}")
+                safe_sheet_name = self._sanitize_filename(sheet_name)
+                pdf_filename = f"{safe_sheet_name}_{timestamp}.pdf"
+                export_targets.append((sheet_name, output_dir / pdf_filename))
+            
+            if xw is not None and self._config.enable_excel_app:
+                # Excelの起動は重いため、アプリとブックを一度だけ開いて全シートで共有
+                results = self._export_sheets_with_shared_xlwings(excel_file_path, export_targets)
+            else:
+                # LibreOffice/xlwingsはプロファイルやExcelアプリを共有するため逐次実行
+                results = [
+                    self._export_single_sheet_to_pdf(excel_file_path, sheet_name, pdf_path)
+                    for sheet_name, pdf_path in export_targets
+                ]
+            
+            for (sheet_name, pdf_path), success in zip(export_targets, results):
+                if success:
+                    pdf_files.append(pdf_path)
+                    self.logger.info(f"PDF出力成功: {sheet_name} -> {pdf_path}")
+                else:
+                    self.logger.warning(f"PDF出力失敗: {sheet_name}")
             
             return pdf_files
             
         except Exception as e:
             self.logger.error(f"PDF出力処理エラー: {str(e)}")
             return []
+        finally:
+            self._wb_cache.clear()
+    
+    def _export_single_sheet_to_pdf(self, excel_file_path: Path, sheet_name: str, pdf_path: Path,
+                                    xl_book=None) -> bool:
+        """1シートをPDFとして出力（シート種別に応じて出力方法を選択）"""
+        try:
+            # アリスト配車表の場合は専用メソッドを使用
+            if "アリスト" in sheet_name or "LT" in sheet_name:
+                self.logger.info(f"🚛 アリスト配車表を検出: {sheet_name}")
+                return self._export_sheet_to_pdf_aristot_optimized(excel_file_path, sheet_name, pdf_path, xl_book)
+            
+            # 通常のPDF出力
+            return self._export_sheet_to_pdf_xlwings(excel_file_path, sheet_name, pdf_path, xl_book)
+            
+        except Exception as e:
+            self.logger.error(f"シート '{sheet_name}' のPDF出力エラー: {str(e)}")
+            return False
+    
+    def _export_sheets_with_shared_xlwings(self, excel_file_path: Path, export_targets: List[Tuple[str, Path]]) -> List[bool]:
+        """Excelアプリとブックを一度だけ開き、全シートで共有してPDF出力"""
+        results = None
+        try:
+            with self._open_xlwings_book(excel_file_path) as xl_book:
+                results = [
+                    self._export_single_sheet_to_pdf(excel_file_path, sheet_name, pdf_path, xl_book)
+                    for sheet_name, pdf_path in export_targets
+                ]
+        except Exception as e:
+            self.logger.error(f"Excelアプリケーション起動エラー: {str(e)}")
+        
+        if results is None:
+            # 共有ブックを開けない場合はシートごとに出力
+            results = [
+                self._export_single_sheet_to_pdf(excel_file_path, sheet_name, pdf_path)
+                for sheet_name, pdf_path in export_targets
+            ]
+        return results
+    
+    @contextmanager
+    def _open_xlwings_book(self, excel_file_path: Path, xl_book=None, add_book: bool = True):
+        """xlwingsでブックを開く（共有ブックが渡された場合はそのまま使い、閉じない）"""
+        if xl_book is not None:
+            yield xl_book
+            return
+        
+        # Excelアプリケーションを起動（非表示）
+        app = xw.App(visible=False, add_book=add_book)
+        try:
+            wb = app.books.open(str(excel_file_path))
+            try:
+                yield wb
+            finally:
+                try:
+                    wb.close()
+                except Exception as e:
+                    self.logger.debug(f"ワークブックのクローズエラー: {str(e)}")
+        finally:
+            try:
+                app.quit()
+            except Exception as e:
+                self.logger.debug(f"Excelアプリケーションの終了エラー: {str(e)}")
     
-    def _export_sheet_to_pdf_xlwings(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
+    def _load_workbook_cached(self, excel_file_path: Path):
+        """読み取り専用で使うワークブックを読み込み（同一ファイルは再利用）"""
+        stat = excel_file_path.stat()
+        cache_key = (str(excel_file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        wb = self._wb_cache.get(cache_key)
+        if wb is None:
+            wb = load_workbook(excel_file_path, data_only=False, keep_links=False)  # data_only=Falseで数式も取得
+            self._wb_cache[cache_key] = wb
+        return wb
+    
+    def _export_sheet_to_pdf_xlwings(self, excel_file_path: Path, sheet_name: str, pdf_path: Path,
+                                     xl_book=None) -> bool:
         """xlwingsを使用してシートをPDFに出力（設定に応じて有効/無効）"""
         try:
             # 設定を確認してExcelアプリケーションの使用を判定
-            from ..core.config import Config
-            config = Config()
+            config = self._config
             
             # macOSなど、Excelアプリの使用が無効になっている場合は代替方法を使用
             if not config.enable_excel_app:
                 self.logger.info("Excel アプリケーションの使用が無効化されています。代替方法を使用します")
                 return self._export_sheet_to_pdf_alternative(excel_file_path, sheet_name, pdf_path)
             
-            import xlwings as xw
-            
-            # Excelアプリケーションを起動（非表示）
-            app = xw.App(visible=False)
+            if xw is None:
+                raise ImportError("xlwings")
             
-            try:
-                # ワークブックを開く
-                wb = app.books.open(str(excel_file_path))
-                
+            # Excelアプリケーションを起動してブックを開く（共有ブックがあれば再利用）
+            with self._open_xlwings_book(excel_file_path, xl_book) as wb:
                 # 指定されたシートを取得
                 if sheet_name in [ws.name for ws in wb.sheets]:
                     ws = wb.sheets[sheet_name]
@@ -918,11 +1054,6 @@ class ExcelProcessor:
                 else:
                     self.logger.warning(f"シート '{sheet_name}' が見つかりません")
                     return False
-                    
-            finally:
-                # ワークブックとアプリケーションを閉じる
-                wb.close()
-                app.quit()
                 
         except ImportError:
             self.logger.warning("xlwingsがインストールされていません。代替方法を試行します")
@@ -961,9 +1092,6 @@ class ExcelProcessor:
     def _export_sheet_to_pdf_native_excel(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
         """macOS上でExcelのネイティブPDF出力を使用（AppleScriptまたはLibreOffice）"""
         try:
-            import platform
-            import subprocess
-            
             if platform.system() != "Darwin":  # macOS以外では使用しない
                 return False
             
@@ -1012,10 +1140,6 @@ class ExcelProcessor:
     def _export_sheet_to_pdf_libreoffice_enhanced(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
         """LibreOfficeを使用したExcel印刷品質のPDF出力（改良版）"""
         try:
-            import subprocess
-            import tempfile
-            import shutil
-            
             # LibreOfficeが利用可能かチェック
             if not self._check_libreoffice_available():
                 self.logger.debug("LibreOfficeが見つかりません")
@@ -1030,27 +1154,9 @@ class ExcelProcessor:
                 if not self._extract_single_sheet_to_file(excel_file_path, sheet_name, temp_excel_file):
                     return False
                 
-                # 詳細なページ設定情報を取得
-                source_wb = load_workbook(excel_file_path)
-                page_settings = {}
-                if sheet_name in source_wb.sheetnames:
-                    source_sheet = source_wb[sheet_name]
-                    page_setup = source_sheet.page_setup
-                    
-                    page_settings = {
-                        'scale': page_setup.scale or 100,
-                        'paperSize': page_setup.paperSize,
-                        'orientation': page_setup.orientation,
-                        'fitToWidth': page_setup.fitToWidth,
-                        'fitToHeight': page_setup.fitToHeight,
-                        'leftMargin': page_setup.leftMargin,
-                        'rightMargin': page_setup.rightMargin,
-                        'topMargin': page_setup.topMargin,
-                        'bottomMargin': page_setup.bottomMargin,
-                        'headerMargin': page_setup.headerMargin,
-                        'footerMargin': page_setup.footerMargin
-                    }
-                    
+                # 詳細なページ設定情報を取得（ブック全体は読み込まずシートXMLのみ参照）
+                page_settings = self._read_sheet_page_setup(excel_file_path, sheet_name)
+                if page_settings:
                     self.logger.info(f"シート '{sheet_name}' のページ設定:")
                     self.logger.info(f"  印刷スケール: {page_settings['scale']}%")
                     self.logger.info(f"  用紙サイズ: {page_settings['paperSize']}")
@@ -1062,30 +1168,16 @@ class ExcelProcessor:
                         self.logger.info("🚛 アリスト配車表を検出 - 特別なサイズ調整を適用")
                 else:
                     page_settings = {'scale': 100}
-                source_wb.close()
                 
-                # LibreOfficeでPDF変換（改良版 - アリスト配車表対応）
+                # LibreOfficeでPDF変換（印刷オプションは付けず、ファイル変換のみ行う）
                 cmd = [
                     "soffice",
                     "--headless",
                     "--convert-to", "pdf",
                     "--outdir", str(temp_path),
-                    # 印刷品質向上のオプション
-                    "--invisible",
-                    # 印刷設定を尊重
-                    "-p",  # 印刷向けオプション
                     str(temp_excel_file)
                 ]
                 
-                # アリスト配車表の場合は追加の品質設定
-                if "アリスト" in sheet_name or "LT" in sheet_name:
-                    # PDF品質を最高に設定
-                    cmd.extend([
-                        "--print-to-file",
-                        "--printer-name", "PDF"
-                    ])
-                    self.logger.info("🚛 アリスト配車表用の高品質PDF設定を適用")
-                
                 self.logger.info(f"LibreOffice改良版でPDF変換実行: {sheet_name}")
                 result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
                 
@@ -1110,12 +1202,68 @@ class ExcelProcessor:
             self.logger.debug(f"LibreOffice改良版PDF出力エラー: {str(e)}")
             return False
 
+    def _read_sheet_page_setup(self, excel_file_path: Path, sheet_name: str) -> Optional[Dict[str, Any]]:
+        """シートXMLからページ設定と余白を直接読み取る"""
+        try:
+            with zipfile.ZipFile(excel_file_path) as archive:
+                # シート名 → リレーションID → シートXMLのパスを解決
+                workbook_root = ET.fromstring(archive.read("xl/workbook.xml"))
+                rel_id = None
+                for sheet in workbook_root.iter(f"{_XLSX_MAIN_NS}sheet"):
+                    if sheet.get("name") == sheet_name:
+                        rel_id = sheet.get(f"{_XLSX_REL_NS}id")
+                        break
+                if rel_id is None:
+                    return None
+                
+                rels_root = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+                target = None
+                for rel in rels_root.iter(f"{_XLSX_PKG_REL_NS}Relationship"):
+                    if rel.get("Id") == rel_id:
+                        target = rel.get("Target")
+                        break
+                if target is None:
+                    return None
+                sheet_path = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+                
+                # pageSetup・pageMarginsはsheetDataの後にあるため、要素を解放しながら走査
+                page_setup = {}
+                page_margins = {}
+                with archive.open(sheet_path) as sheet_xml:
+                    for _, elem in ET.iterparse(sheet_xml):
+                        if elem.tag == f"{_XLSX_MAIN_NS}pageSetup":
+                            page_setup = dict(elem.attrib)
+                        elif elem.tag == f"{_XLSX_MAIN_NS}pageMargins":
+                            page_margins = dict(elem.attrib)
+                        elem.clear()
+            
+            def to_int(value):
+                return int(value) if value is not None else None
+            
+            def to_float(value):
+                return float(value) if value is not None else None
+            
+            return {
+                'scale': to_int(page_setup.get('scale')) or 100,
+                'paperSize': to_int(page_setup.get('paperSize')),
+                'orientation': page_setup.get('orientation'),
+                'fitToWidth': to_int(page_setup.get('fitToWidth')),
+                'fitToHeight': to_int(page_setup.get('fitToHeight')),
+                'leftMargin': to_float(page_margins.get('left')),
+                'rightMargin': to_float(page_margins.get('right')),
+                'topMargin': to_float(page_margins.get('top')),
+                'bottomMargin': to_float(page_margins.get('bottom')),
+                'headerMargin': to_float(page_margins.get('header')),
+                'footerMargin': to_float(page_margins.get('footer'))
+            }
+            
+        except Exception as e:
+            self.logger.debug(f"ページ設定読み取りエラー: {str(e)}")
+            return None
+    
     def _check_libreoffice_available(self) -> bool:
         """LibreOfficeが利用可能かチェック"""
         try:
-            import subprocess
-            import shutil
-            
             # まずsofficeコマンドが存在するかチェック
             if not shutil.which("soffice"):
                 self.logger.debug("sofficeコマンドが見つかりません")
@@ -1132,23 +1280,24 @@ class ExcelProcessor:
             self.logger.debug(f"LibreOffice利用可能性チェックエラー: {str(e)}")
             return False
     
-    def _export_sheet_to_pdf_aristot_optimized(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
+    def _export_sheet_to_pdf_aristot_optimized(self, excel_file_path: Path, sheet_name: str, pdf_path: Path,
+                                               xl_book=None) -> bool:
         """アリスト配車表専用の最適化されたPDF出力"""
         try:
             self.logger.info(f"🚛 アリスト配車表専用PDF生成開始: {sheet_name}")
             
             # 1. xlwingsの直接印刷機能を最優先で試行
-            if self._export_sheet_to_pdf_xlwings_direct_print(excel_file_path, sheet_name, pdf_path):
+            if self._export_sheet_to_pdf_xlwings_direct_print(excel_file_path, sheet_name, pdf_path, xl_book):
                 self.logger.info("✅ アリスト配車表PDF生成成功（xlwings直接印刷）")
                 return True
             
             # 2. xlwingsの改良版を試行
-            if self._export_sheet_to_pdf_xlwings_enhanced(excel_file_path, sheet_name, pdf_path):
+            if self._export_sheet_to_pdf_xlwings_enhanced(excel_file_path, sheet_name, pdf_path, xl_book):
                 self.logger.info("✅ アリスト配車表PDF生成成功（xlwings改良版）")
                 return True
             
             # 3. 標準xlwingsを試行
-            if self._export_sheet_to_pdf_xlwings(excel_file_path, sheet_name, pdf_path):
+            if self._export_sheet_to_pdf_xlwings(excel_file_path, sheet_name, pdf_path, xl_book):
                 self.logger.info("✅ アリスト配車表PDF生成成功（xlwings標準）")
                 return True
             
@@ -1169,29 +1318,25 @@ class ExcelProcessor:
             self.logger.error(f"アリスト配車表PDF生成エラー: {str(e)}")
             return False
     
-    def _export_sheet_to_pdf_xlwings_direct_print(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
+    def _export_sheet_to_pdf_xlwings_direct_print(self, excel_file_path: Path, sheet_name: str, pdf_path: Path,
+                                                  xl_book=None) -> bool:
         """xlwingsを使用してExcelの直接印刷機能でPDF出力（アリスト配車表専用）"""
         try:
             # 設定を確認してExcelアプリケーションの使用を判定
-            from ..core.config import Config
-            config = Config()
+            config = self._config
             
             # macOSなど、Excelアプリの使用が無効になっている場合でも、アリスト配車表は試行
             if not config.enable_excel_app:
                 self.logger.info("🚛 Excel アプリケーションは通常無効ですが、アリスト配車表のため試行します")
                 # return False  # アリスト配車表の場合は強制的に試行
             
-            import xlwings as xw
+            if xw is None:
+                raise ImportError("xlwings")
             
             self.logger.info(f"🚛 xlwings直接印刷でアリスト配車表PDF生成: {sheet_name}")
             
-            # Excelアプリケーションを起動（表示）
-            app = xw.App(visible=False)
-            
-            try:
-                # ワークブックを開く
-                wb = app.books.open(str(excel_file_path))
-                
+            # Excelアプリケーションを起動してブックを開く（共有ブックがあれば再利用）
+            with self._open_xlwings_book(excel_file_path, xl_book) as wb:
                 # 指定されたシートを取得
                 if sheet_name in [ws.name for ws in wb.sheets]:
                     ws = wb.sheets[sheet_name]
@@ -1236,14 +1381,6 @@ class ExcelProcessor:
                 else:
                     self.logger.warning(f"シート '{sheet_name}' が見つかりません")
                     return False
-                    
-            finally:
-                # ワークブックとアプリケーションを閉じる
-                try:
-                    wb.close()
-                    app.quit()
-                except:
-                    pass
                 
         except ImportError:
             self.logger.debug("xlwingsがインストールされていません")
@@ -1252,27 +1389,23 @@ class ExcelProcessor:
             self.logger.debug(f"xlwings直接印刷エラー: {str(e)}")
             return False
     
-    def _export_sheet_to_pdf_xlwings_enhanced(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
+    def _export_sheet_to_pdf_xlwings_enhanced(self, excel_file_path: Path, sheet_name: str, pdf_path: Path,
+                                              xl_book=None) -> bool:
         """xlwingsを使用した改良版PDF出力（アリスト配車表専用）"""
         try:
-            from ..core.config import Config
-            config = Config()
+            config = self._config
             
             if not config.enable_excel_app:
                 self.logger.info("🚛 Excel アプリケーションは通常無効ですが、アリスト配車表のため試行します")
                 # return False  # アリスト配車表の場合は強制的に試行
             
-            import xlwings as xw
+            if xw is None:
+                raise ImportError("xlwings")
             
             self.logger.info(f"🚛 xlwings改良版でアリスト配車表PDF生成: {sheet_name}")
             
-            # Excelアプリケーションを起動
-            app = xw.App(visible=False, add_book=False)
-            
-            try:
-                # ワークブックを開く
-                wb = app.books.open(str(excel_file_path))
-                
+            # Excelアプリケーションを起動してブックを開く（共有ブックがあれば再利用）
+            with self._open_xlwings_book(excel_file_path, xl_book, add_book=False) as wb:
                 if sheet_name in [ws.name for ws in wb.sheets]:
                     ws = wb.sheets[sheet_name]
                     
@@ -1296,13 +1429,6 @@ class ExcelProcessor:
                 else:
                     self.logger.warning(f"シート '{sheet_name}' が見つかりません")
                     return False
-                    
-            finally:
-                try:
-                    wb.close()
-                    app.quit()
-                except:
-                    pass
                 
         except ImportError:
             self.logger.debug("xlwingsがインストールされていません")
@@ -1314,10 +1440,8 @@ class ExcelProcessor:
     def _extract_single_sheet_to_file(self, source_file: Path, sheet_name: str, target_file: Path) -> bool:
         """指定したシートのみを新しいExcelファイルに抽出"""
         try:
-            from openpyxl import load_workbook, Workbook
-            
-            # 元のワークブックを読み込み
-            source_wb = load_workbook(source_file)
+            # 元のワークブックを読み込み（weasyprint出力と共有するため変更しない）
+            source_wb = self._load_workbook_cached(source_file)
             
             if sheet_name not in source_wb.sheetnames:
                 self.logger.warning(f"シート '{sheet_name}' が見つかりません")
@@ -1398,7 +1522,6 @@ class ExcelProcessor:
             
             # ファイルを保存
             target_wb.save(target_file)
-            source_wb.close()
             target_wb.close()
             
             self.logger.debug(f"シート抽出成功: {sheet_name} -> {target_file}")
@@ -1411,9 +1534,6 @@ class ExcelProcessor:
     def _export_sheet_to_pdf_native_excel_enhanced(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
         """改良版ネイティブExcel PDF出力（macOS AppleScript使用）"""
         try:
-            import platform
-            import subprocess
-            
             if platform.system() != "Darwin":  # macOS以外では使用しない
                 return False
             
@@ -1464,9 +1584,6 @@ class ExcelProcessor:
     def _export_sheet_to_pdf_libreoffice(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
         """LibreOfficeを使用してExcelファイルをPDF出力"""
         try:
-            import subprocess
-            import shutil
-            
             # LibreOfficeがインストールされているかチェック
             libreoffice_cmd = None
             for cmd in ['soffice', 'libreoffice', '/Applications/LibreOffice.app/Contents/MacOS/soffice']:
@@ -1537,27 +1654,37 @@ class ExcelProcessor:
     def _export_sheet_to_pdf_weasyprint(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
         """weasprintを使用してPDF出力（Excelレイアウト再現強化版）"""
         try:
-            from weasyprint import HTML, CSS
+            if HTML is None:
+                raise ImportError("weasyprint")
             
             # openpyxlでワークシートを読み込み（セル結合とスタイル情報を保持）
-            wb = load_workbook(excel_file_path, data_only=False)  # data_only=Falseで数式も取得
+            wb = self._load_workbook_cached(excel_file_path)
             if sheet_name not in wb.sheetnames:
                 self.logger.warning(f"シート '{sheet_name}' が見つかりません")
                 return False
             
             ws = wb[sheet_name]
             
-            # 印刷設定を考慮してHTMLテーブルを生成
-            html_content = self._generate_excel_like_html_from_worksheet(ws, sheet_name)
-            
-            # 印刷スケールを取得してCSSに反映
-            scale = self._get_print_scale(ws)
-            css_style = CSS(string=self._get_excel_like_css_with_scale(scale))
+            # 印刷設定を考慮したHTMLを一時ファイルへ逐次書き出し（巨大な文字列を保持しない）
+            with tempfile.NamedTemporaryFile('w', suffix='.html', encoding='utf-8', delete=False) as html_file:
+                self._write_excel_like_html_from_worksheet(ws, sheet_name, html_file)
+            html_path = Path(html_file.name)
             
-            # HTMLからPDFを生成
-            HTML(string=html_content).write_pdf(str(pdf_path), stylesheets=[css_style])
+            try:
+                # 印刷スケールを取得してCSSに反映
+                scale = self._get_print_scale(ws)
+                css_style = self._get_pdf_css(scale)
+                
+                # HTMLファイルからPDFを生成
+                HTML(filename=str(html_path)).write_pdf(
+                    str(pdf_path),
+                    stylesheets=[css_style],
+                    font_config=self._get_font_config(),
+                    cache=self._weasyprint_cache
+                )
+            finally:
+                html_path.unlink(missing_ok=True)
             
-            wb.close()
             self.logger.info(f"weasyprint でPDF出力成功（Excel風レイアウト）: {sheet_name} -> {pdf_path}")
             return True
             
@@ -1568,6 +1695,20 @@ class ExcelProcessor:
             self.logger.debug(f"weasyprint でのPDF出力エラー: {str(e)}")
             return False
     
+    def _get_pdf_css(self, scale: int):
+        """印刷スケールに対応するWeasyPrint用CSSを取得（スケールごとに一度だけ解析）"""
+        css_style = self._pdf_css_cache.get(scale)
+        if css_style is None:
+            css_style = CSS(string=self._get_excel_like_css_with_scale(scale), font_config=self._get_font_config())
+            self._pdf_css_cache[scale] = css_style
+        return css_style
+    
+    def _get_font_config(self):
+        """WeasyPrintのフォント設定を取得（初回のみ生成）"""
+        if self._font_config is None:
+            self._font_config = FontConfiguration()
+        return self._font_config
+    
     def _get_excel_like_css(self) -> str:
         """Excel印刷レイアウトにより近いCSSスタイル"""
         return """
@@ -1608,11 +1749,9 @@ class ExcelProcessor:
         .red-bg { background-color: #FFC7CE; }
         """
     
-    def _generate_excel_like_html_from_worksheet(self, worksheet, sheet_name: str) -> str:
-        """Excelの印刷レイアウトにより近いHTMLテーブルを生成（印刷設定考慮）"""
+    def _write_excel_like_html_from_worksheet(self, worksheet, sheet_name: str, out):
+        """Excelの印刷レイアウトにより近いHTMLテーブルを出力先へ逐次書き出し（印刷設定考慮）"""
         try:
-            html_rows = []
-            
             # 印刷範囲を取得
             print_area_range = self._get_print_area(worksheet)
             if print_area_range:
@@ -1624,8 +1763,12 @@ class ExcelProcessor:
                 min_row, min_col, max_row, max_col = data_range
                 self.logger.info(f"データ範囲使用: {min_row}行目〜{max_row}行目, {min_col}列目〜{max_col}列目")
             
-            # マージされたセル範囲を取得
-            merged_ranges = list(worksheet.merged_cells.ranges)
+            # マージされたセルの索引を取得
+            merge_index = self._build_merge_index(worksheet)
+            
+            out.write('<!DOCTYPE html><html><head><meta charset="UTF-8"><title>')
+            out.write(sheet_name.translate(_HTML_ESCAPE_TABLE))
+            out.write('</title></head><body><table>')
             
             for row in range(1, max_row + 1):
                 html_cells = []
@@ -1638,16 +1781,16 @@ class ExcelProcessor:
                     rowspan = 1
                     colspan = 1
                     
-                    for merged_range in merged_ranges:
-                        if cell.coordinate in merged_range:
-                            # マージされたセルの左上セル以外はスキップ
-                            if cell.row != merged_range.min_row or cell.column != merged_range.min_col:
-                                skip_cell = True
-                                break
-                            else:
-                                # 左上セルの場合はrowspanとcolspanを設定
-                                rowspan = merged_range.max_row - merged_range.min_row + 1
-                                colspan = merged_range.max_col - merged_range.min_col + 1
+                    merged_bounds = merge_index.get((row, col))
+                    if merged_bounds:
+                        min_row_m, min_col_m, max_row_m, max_col_m = merged_bounds
+                        # マージされたセルの左上セル以外はスキップ
+                        if row != min_row_m or col != min_col_m:
+                            skip_cell = True
+                        else:
+                            # 左上セルの場合はrowspanとcolspanを設定
+                            rowspan = max_row_m - min_row_m + 1
+                            colspan = max_col_m - min_col_m + 1
                     
                     if skip_cell:
                         continue
@@ -1663,42 +1806,29 @@ class ExcelProcessor:
                     cell_classes = self._get_cell_css_classes(cell)
                     
                     # HTMLセルを生成
-                    attrs = []
+                    attrs_str = ''
                     if rowspan > 1:
-                        attrs.append(f'rowspan="{rowspan}"')
+                        attrs_str += _ROWSPAN_ATTR % rowspan
                     if colspan > 1:
-                        attrs.append(f'colspan="{colspan}"')
+                        attrs_str += _COLSPAN_ATTR % colspan
                     if cell_classes:
-                        attrs.append(f'class="{cell_classes}"')
+                        attrs_str += _CLASS_ATTR % cell_classes
                     
-                    attrs_str = ' ' + ' '.join(attrs) if attrs else ''
-                    html_cells.append(f"<td{attrs_str}>{cell_value_str}</td>")
+                    html_cells.append(_TD_TEMPLATE % (attrs_str, cell_value_str.translate(_HTML_ESCAPE_TABLE)))
                 
                 if html_cells:
-                    html_rows.append(f"<tr>{''.join(html_cells)}</tr>")
+                    out.write('<tr>')
+                    out.writelines(html_cells)
+                    out.write('</tr>')
             
-            # HTMLドキュメントを構成
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>{sheet_name}</title>
-            </head>
-            <body>
-                <table>
-                    {''.join(html_rows)}
-                </table>
-            </body>
-            </html>
-            """
-            
-            return html_content
+            out.write('</table></body></html>')
             
         except Exception as e:
             self.logger.error(f"Excel風HTML生成エラー: {str(e)}")
-            # フォールバック: 従来のHTML生成
-            return self._generate_html_from_worksheet(worksheet, sheet_name)
+            # フォールバック: 書きかけの内容を破棄して従来のHTML生成
+            out.seek(0)
+            out.truncate()
+            out.write(self._generate_html_from_worksheet(worksheet, sheet_name))
     
     def _get_cell_css_classes(self, cell) -> str:
         """セルのスタイルからCSSクラスを決定"""
@@ -1762,9 +1892,6 @@ class ExcelProcessor:
         try:
             if hasattr(worksheet, 'print_area') and worksheet.print_area:
                 # 印刷範囲が設定されている場合
-                import openpyxl.utils
-                from openpyxl.utils import range_boundaries
-                
                 # 印刷範囲文字列をパース（例: "Sheet1!$A$1:$M$39"）
                 print_area = worksheet.print_area
                 if '!' in print_area:
@@ -1879,34 +2006,51 @@ class ExcelProcessor:
     def _generate_html_from_worksheet(self, worksheet, sheet_name: str) -> str:
         """ワークシートからHTMLテーブルを生成（セル結合を考慮）"""
         try:
-            html_rows = []
-            max_row = min(worksheet.max_row, 200)  # 最大200行まで処理
-            max_col = min(worksheet.max_column, 50)  # 最大50列まで処理
+            # HTML断片を一つのリストに集め、最後に一度だけ結合する
+            safe_sheet_name = sheet_name.translate(_HTML_ESCAPE_TABLE)
+            parts = [
+                '<!DOCTYPE html><html><head><meta charset="UTF-8"><title>', safe_sheet_name,
+                '</title></head><body><div class="title">', safe_sheet_name, '</div><table>'
+            ]
+            # 書式だけの空セルでmax_row/max_columnが膨らむため、値のある範囲に絞る
+            max_row, max_col = self._get_used_bounds(
+                worksheet,
+                min(worksheet.max_row, 200),  # 最大200行まで処理
+                min(worksheet.max_column, 50)  # 最大50列まで処理
+            )
             
-            # マージされたセル範囲を取得
-            merged_ranges = list(worksheet.merged_cells.ranges)
+            # マージされたセルの索引を取得
+            merge_index = self._build_merge_index(worksheet)
             
-            for row in range(1, max_row + 1):
-                html_cells = []
+            # 背景色ありの塗りつぶしIDを事前に収集（セルごとのスタイル解決を避ける）
+            filled_ids = self._collect_filled_style_ids(worksheet)
+            
+            # 対象範囲を一度のiter_rowsで走査
+            # （iter_rowsは0を上限なしと解釈するため、値のないシートは空の表にする）
+            if max_row == 0:
+                sheet_rows = ()
+            else:
+                sheet_rows = worksheet.iter_rows(min_row=1, max_row=max_row, min_col=1, max_col=max_col)
+            for row, row_cells in enumerate(sheet_rows, start=1):
+                row_start = len(parts)
+                parts.append('<tr>')
                 
-                for col in range(1, max_col + 1):
-                    cell = worksheet.cell(row=row, column=col)
-                    
+                for col, cell in enumerate(row_cells, start=1):
                     # マージされたセルの処理
                     skip_cell = False
                     rowspan = 1
                     colspan = 1
                     
-                    for merged_range in merged_ranges:
-                        if cell.coordinate in merged_range:
-                            # マージされたセルの左上セル以外はスキップ
-                            if cell.row != merged_range.min_row or cell.column != merged_range.min_col:
-                                skip_cell = True
-                                break
-                            else:
-                                # 左上セルの場合はrowspanとcolspanを設定
-                                rowspan = merged_range.max_row - merged_range.min_row + 1
-                                colspan = merged_range.max_col - merged_range.min_col + 1
+                    merged_bounds = merge_index.get((row, col))
+                    if merged_bounds:
+                        min_row_m, min_col_m, max_row_m, max_col_m = merged_bounds
+                        # マージされたセルの左上セル以外はスキップ
+                        if row != min_row_m or col != min_col_m:
+                            skip_cell = True
+                        else:
+                            # 左上セルの場合はrowspanとcolspanを設定
+                            rowspan = max_row_m - min_row_m + 1
+                            colspan = max_col_m - min_col_m + 1
                     
                     if skip_cell:
                         continue
@@ -1917,42 +2061,31 @@ class ExcelProcessor:
                     
                     # セルのクラスを決定
                     cell_class = ""
-                    if cell.fill and hasattr(cell.fill, 'start_color') and cell.fill.start_color.rgb:
+                    if filled_ids is not None:
+                        if cell.has_style and cell._style.fillId in filled_ids:
+                            cell_class = "header-cell"
+                    elif cell.fill and hasattr(cell.fill, 'start_color') and cell.fill.start_color.rgb:
                         cell_class = "header-cell"
                     
                     # HTMLセルを生成
-                    attrs = []
+                    attrs_str = ''
                     if rowspan > 1:
-                        attrs.append(f'rowspan="{rowspan}"')
+                        attrs_str += _ROWSPAN_ATTR % rowspan
                     if colspan > 1:
-                        attrs.append(f'colspan="{colspan}"')
+                        attrs_str += _COLSPAN_ATTR % colspan
                     if cell_class:
-                        attrs.append(f'class="{cell_class}"')
-                    
-                    attrs_str = ' ' + ' '.join(attrs) if attrs else ''
-                    html_cells.append(f"<td{attrs_str}>{cell_value_str}</td>")
+                        attrs_str += _CLASS_ATTR % cell_class
+                    parts.append(_TD_TEMPLATE % (attrs_str, cell_value_str.translate(_HTML_ESCAPE_TABLE)))
                 
-                if html_cells:
-                    html_rows.append(f"<tr>{''.join(html_cells)}</tr>")
+                if len(parts) == row_start + 1:
+                    # セルが一つもない行（全てマージでスキップ）は出力しない
+                    del parts[row_start:]
+                else:
+                    parts.append('</tr>')
             
             # HTMLドキュメントを構成
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>{sheet_name}</title>
-            </head>
-            <body>
-                <div class="title">{sheet_name}</div>
-                <table>
-                    {''.join(html_rows)}
-                </table>
-            </body>
-            </html>
-            """
-            
-            return html_content
+            parts.append('</table></body></html>')
+            return ''.join(parts)
             
         except Exception as e:
             self.logger.error(f"HTML生成エラー: {str(e)}")
@@ -1971,35 +2104,44 @@ class ExcelProcessor:
             </html>
             """
     
+    def _get_used_bounds(self, worksheet, row_limit: int, col_limit: int) -> Tuple[int, int]:
+        """上限内で値が入っている最終行・最終列を取得"""
+        last_row = 0
+        last_col = 0
+        for row, values in enumerate(worksheet.iter_rows(max_row=row_limit, max_col=col_limit, values_only=True), start=1):
+            for col in range(len(values), 0, -1):
+                if values[col - 1] is not None:
+                    last_row = row
+                    last_col = max(last_col, col)
+                    break
+        return last_row, last_col
+    
+    def _collect_filled_style_ids(self, worksheet) -> Optional[set]:
+        """ブック内の塗りつぶし定義のうち、背景色があるもののIDを収集"""
+        try:
+            filled_ids = set()
+            for fill_id, fill in enumerate(worksheet.parent._fills):
+                # パターン塗りつぶしはfill_type、グラデーションは常に背景ありとみなす
+                fill_type = getattr(fill, 'fill_type', 'gradient')
+                if fill_type and fill_type != 'none':
+                    filled_ids.add(fill_id)
+            return filled_ids
+        except Exception as e:
+            self.logger.debug(f"塗りつぶし情報の収集エラー: {str(e)}")
+            return None
+    
     def _export_sheet_to_pdf_pandas(self, excel_file_path: Path, sheet_name: str, pdf_path: Path) -> bool:
         """pandasを使用したシンプルなPDF出力（フォールバック）"""
         try:
-            import pandas as pd
-            
             # Excelファイルからシートを読み込み
-            df = pd.read_excel(excel_file_path, sheet_name=sheet_name)
+            df = pd.read_excel(excel_file_path, sheet_name=sheet_name, engine=_EXCEL_READ_ENGINE)
             
-            # HTMLに変換
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>{sheet_name}</title>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                    table {{ border-collapse: collapse; width: 100%; }}
-                    th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                    th {{ background-color: #f2f2f2; }}
-                    h1 {{ color: #333; }}
-                </style>
-            </head>
-            <body>
-                <h1>{sheet_name}</h1>
-                {df.to_html(escape=False, index=False)}
-            </body>
-            </html>
-            """
+            # HTMLに変換（テーブル部分はpandasのto_htmlで一括生成）
+            html_table = df.to_html(escape=True, index=False, border=0, classes='data')
+            html_content = _PANDAS_HTML_TEMPLATE.format(
+                sheet_name=sheet_name.translate(_HTML_ESCAPE_TABLE),
+                table=html_table
+            )
             
             # HTMLファイルとして一時保存し、警告メッセージを出力
             html_temp_file = pdf_path.with_suffix('.html')
@@ -2019,8 +2161,8 @@ class ExcelProcessor:
         """ホウスイ川島出庫依頼書とアリスト鶴ヶ島 (LT1)シートをPDFに出力"""
         try:
             target_sheets = [
-                "ホウスイ川島出庫依頼書",
-                "アリスト鶴ヶ島 (LT1)"
+                HOUSUI_SHEET_NAME,
+                ARIST_SHEET_NAME
             ]
             
             self.logger.info("PDF出力開始: ホウスイ川島出庫依頼書、アリスト鶴ヶ島 (LT1)")
@@ -2035,4 +2177,10 @@ class ExcelProcessor:
                 self.logger.warning("PDF出力に失敗しました")
                 
         except Exception as e:
-            self.logger.error(f"PDF出力エラー: {str(e)}") 
\ No newline at end of file
+            self.logger.error(f"PDF出力エラー: {str(e)}") 
+
+
+@lru_cache(maxsize=256)
+def _sanitize_name(filename: str) -> str:
+    """ファイル名に使用できない文字を置換（同じ名前は結果を再利用）"""
+    return _FILENAME_SANITIZE_RE.sub('_', filename)
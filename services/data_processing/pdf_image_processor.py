@@ -4,12 +4,17 @@
 PDF画像変換処理モジュール
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 
 from ..core.logger import Logger
-from ..core.pdf_to_image import PDFToImageConverter
+from ..core.pdf_to_image import PDFToImageConverter, convert_pdf_to_images_worker
+
+# プロセス並列にする最小ファイル数（ワーカー起動コストが小さなPDF数件の変換時間を上回るため）
+_PARALLEL_MIN_FILES = 4
 
 
 class PDFImageProcessor:
@@ -20,13 +25,15 @@ class PDFImageProcessor:
         self.config = config
         self.pdf_converter = PDFToImageConverter()
         
-    def process_all_pdfs(self, pdf_files: List[Path], output_dir: Path) -> Dict[str, List[Path]]:
+    def process_all_pdfs(self, pdf_files: List[Path], output_dir: Path,
+                         max_workers: Optional[int] = None) -> Dict[str, List[Path]]:
         """
         複数のPDFファイルを画像に変換
         
         Args:
             pdf_files: 変換対象のPDFファイルリスト
             output_dir: 画像出力ディレクトリ
+            max_workers: 変換プロセス数（省略時はCPU数、1で逐次処理）
         
         Returns:
             PDFファイル名をキーとした画像パスリストの辞書
@@ -44,12 +51,33 @@ class PDFImageProcessor:
             converted_images = {}
             total_images = 0
             
-            for pdf_file in pdf_files:
+            if max_workers is None:
+                max_workers = os.cpu_count() or 1
+            max_workers = min(len(pdf_files), max_workers)
+            if max_workers > 1 and len(pdf_files) >= _PARALLEL_MIN_FILES:
+                # PDFごとのラスタライズは独立しているためプロセス並列で実行
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    futures = [
+                        executor.submit(convert_pdf_to_images_worker, pdf_file, output_dir,
+                                        self._get_conversion_settings(pdf_file))
+                        for pdf_file in pdf_files
+                    ]
+                    results = []
+                    for pdf_file, future in zip(pdf_files, futures):
+                        try:
+                            results.append(future.result())
+                        except Exception as e:
+                            self.logger.error(f"PDF変換エラー ({pdf_file.name}): {str(e)}")
+                            results.append([])
+            else:
+                results = [None] * len(pdf_files)
+            
+            for pdf_file, image_paths in zip(pdf_files, results):
                 try:
-                    self.logger.info(f"PDF変換開始: {pdf_file.name}")
-                    
-                    # PDFを画像に変換
-                    image_paths = self._convert_single_pdf(pdf_file, output_dir)
+                    # PDFを画像に変換（並列変換済みの場合はその結果を使用）
+                    if image_paths is None:
+                        self.logger.info(f"PDF変換開始: {pdf_file.name}")
+                        image_paths = self._convert_single_pdf(pdf_file, output_dir)
                     
                     if image_paths:
                         converted_images[pdf_file.name] = image_paths
@@ -86,20 +114,11 @@ class PDFImageProcessor:
                 self.logger.error(f"PDFファイルが見つかりません: {pdf_file}")
                 return []
             
-            # LINE送信に最適化された設定を取得
-            settings = self.pdf_converter.get_optimal_settings_for_line()
-            
-            # ファイル種別に応じて設定を調整
-            if "納品リスト" in pdf_file.name:
-                settings['max_pages'] = 3  # 納品リストは最大3ページ
-            else:
-                settings['max_pages'] = 2  # 出庫依頼書・配車表は最大2ページ
-            
             # PDFを画像に変換
             image_paths = self.pdf_converter.convert_pdf_to_images(
                 pdf_path=pdf_file,
                 output_dir=output_dir,
-                **settings
+                **self._get_conversion_settings(pdf_file)
             )
             
             return image_paths
@@ -108,6 +127,18 @@ class PDFImageProcessor:
             self.logger.error(f"単一PDF変換エラー ({pdf_file.name}): {str(e)}")
             return []
     
+    def _get_conversion_settings(self, pdf_file: Path) -> dict:
+        """ファイル種別に応じた画像変換設定を取得"""
+        # LINE送信に最適化された設定を取得
+        settings = self.pdf_converter.get_optimal_settings_for_line()
+        
+        # ファイル種別に応じて設定を調整
+        if "納品リスト" in pdf_file.name:
+            settings['max_pages'] = 3  # 納品リストは最大3ページ
+        else:
+            settings['max_pages'] = 2  # 出庫依頼書・配車表は最大2ページ
+        return settings
+    
     def get_image_summary(self, converted_images: Dict[str, List[Path]]) -> Dict[str, int]:
         """
         変換結果のサマリーを取得
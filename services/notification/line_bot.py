@@ -4,23 +4,69 @@
 LINE Bot 通知モジュール
 """
 
-import requests
+import re
 import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import tempfile
+import uuid
+from collections import Counter
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 from pathlib import Path
 
 from ..core.logger import Logger
-from ..data_processing.excel_processor import ValidationError
+from ..core.models import ValidationError
 from ..core.pdf_to_image import PDFToImageConverter
 from ..core.cloud_storage import CloudStorageUploader
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 配車表PDFのファイル名キーワード（1回の走査で判定するため正規表現に結合）
+_DISPATCH_TABLE_NAME_RE = re.compile('アリスト|配車|LT')
+
+
+def _json_dumps(data) -> bytes:
+    """送信用JSONをUTF-8のバイト列に変換（orjsonがあれば使用）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    # 日本語を\uXXXXにエスケープしないことで送信サイズを抑える
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
 
 class LineBotNotifier:
     """LINE Bot 通知クラス"""
     
+    # プッシュメッセージ1リクエストあたりの最大メッセージ数（LINE API仕様）
+    _MAX_MESSAGES_PER_PUSH = 5
+    
+    # LINE Bot無効時に何もしない関数へ差し替える送信系メソッド
+    _DISABLED_SEND_METHODS = (
+        'send_message',
+        'send_messages',
+        'send_process_summary',
+        'send_error_details',
+        'send_start_notification',
+        'send_phase_notification',
+        'send_emergency_notification',
+        'send_file_generation_notification',
+        'send_integrated_completion_notification',
+    )
+    
+    # フェーズ別通知の絵文字
+    _PHASE_EMOJI_MAP = {
+        "スクレイピング": "🕷️",
+        "データ抽出": "📄",
+        "マスタ付け合わせ": "🔍",
+        "Excel生成": "📊",
+        "通知": "📢"
+    }
+    
     def __init__(self):
         self.logger = Logger(__name__)
         
@@ -33,6 +79,26 @@ class LineBotNotifier:
         self.api_url = "https://api.line.me/v2/bot/message/push"
         self.content_api_url = "https://api-data.line.me/v2/bot/message/content"
         
+        # LINE APIへの接続はセッションで再利用（送信ごとのTCP/TLSハンドシェイクを省略）
+        self._headers = {
+            'Authorization': f'Bearer {self.channel_access_token}',
+            'Content-Type': 'application/json'
+        }
+        # 429/5xxはRetry-Afterを尊重して指数バックオフで再送（POSTも対象。重複送信はリトライキーで防止）
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['POST']),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        ))
+        
         # PDF変換クラスを初期化
         self.pdf_converter = PDFToImageConverter()
         
@@ -43,10 +109,30 @@ class LineBotNotifier:
         if not self.channel_access_token or not self.group_id or self.group_id == 'dummy':
             self.logger.warning("LINE Bot設定が不完全です。通知機能は無効になります。")
             self.enabled = False
+            
+            # 無効時は送信系メソッドを何もしない関数に差し替え（メッセージ構築を省略）
+            for method_name in self._DISABLED_SEND_METHODS:
+                setattr(self, method_name, self._disabled_noop)
         else:
             self.enabled = True
             self.logger.info("LINE Bot通知機能が有効です（グループチャット専用）")
     
+    @staticmethod
+    def _disabled_noop(*args, **kwargs) -> bool:
+        """LINE Bot無効時の送信処理（何もせずFalseを返す）"""
+        return False
+    
+    def close(self):
+        """HTTPセッションを閉じる"""
+        self._session.close()
+    
+    def _post_push_message(self, data: Dict[str, Any]) -> requests.Response:
+        """プッシュメッセージAPIにPOST（共有セッションを使用）"""
+        # 再送時にLINE側で同一リクエストと判定されるよう、送信ごとにリトライキーを付与
+        headers = dict(self._headers)
+        headers['X-Line-Retry-Key'] = str(uuid.uuid4())
+        return self._session.post(self.api_url, data=_json_dumps(data), headers=headers, timeout=10)
+    
     def send_message(self, message: str) -> bool:
         """LINE メッセージを送信"""
         if not self.enabled:
@@ -54,11 +140,6 @@ class LineBotNotifier:
             return False
         
         try:
-            headers = {
-                'Authorization': f'Bearer {self.channel_access_token}',
-                'Content-Type': 'application/json'
-            }
-            
             data = {
                 'to': self.group_id,
                 'messages': [
@@ -69,12 +150,7 @@ class LineBotNotifier:
                 ]
             }
             
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                data=json.dumps(data),
-                timeout=10
-            )
+            response = self._post_push_message(data)
             
             if response.status_code == 200:
                 self.logger.info("LINE メッセージ送信成功")
@@ -90,6 +166,42 @@ class LineBotNotifier:
             self.logger.error(f"LINE メッセージ送信エラー: {str(e)}")
             return False
     
+    def send_messages(self, messages: List[str]) -> bool:
+        """複数のテキストメッセージをまとめて送信（1リクエスト最大5件）"""
+        if not self.enabled:
+            self.logger.warning("LINE Bot が無効のため、メッセージ送信をスキップしました")
+            return False
+        
+        try:
+            all_success = True
+            
+            # プッシュメッセージAPIは1リクエストで5件まで送信できるため、5件ずつまとめて送信
+            for start in range(0, len(messages), self._MAX_MESSAGES_PER_PUSH):
+                data = {
+                    'to': self.group_id,
+                    'messages': [
+                        {'type': 'text', 'text': message}
+                        for message in messages[start:start + self._MAX_MESSAGES_PER_PUSH]
+                    ]
+                }
+                
+                response = self._post_push_message(data)
+                
+                if response.status_code == 200:
+                    self.logger.info(f"LINE メッセージ一括送信成功: {len(data['messages'])}件")
+                else:
+                    self.logger.error(f"LINE メッセージ一括送信失敗: {response.status_code} - {response.text}")
+                    all_success = False
+            
+            return all_success
+                
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"LINE API リクエストエラー: {str(e)}")
+            return False
+        except Exception as e:
+            self.logger.error(f"LINE メッセージ一括送信エラー: {str(e)}")
+            return False
+    
     def send_process_summary(self, summary: Dict[str, Any]) -> bool:
         """処理サマリーを送信"""
         try:
@@ -107,6 +219,13 @@ class LineBotNotifier:
     def _build_summary_message(self, summary: Dict[str, Any]) -> str:
         """サマリーメッセージを構築"""
         try:
+            # エラーの有無で末尾のメッセージを切り替え
+            error_count = summary.get('エラーデータ件数', 0)
+            if error_count > 0:
+                trailer = "⚠️ エラーが発生しています。\n詳細はエラーレポートを確認してください。"
+            else:
+                trailer = "✨ すべて正常に処理されました！"
+            
             lines = [
                 "📊 SMCL 納品リスト処理完了",
                 "",
@@ -114,30 +233,18 @@ class LineBotNotifier:
                 "",
                 "📈 処理結果:",
                 f"  ✅ 正常データ: {summary.get('正常データ件数', 0)}件",
-                f"  ❌ エラーデータ: {summary.get('エラーデータ件数', 0)}件",
+                f"  ❌ エラーデータ: {error_count}件",
                 f"  📊 生成Excel: {summary.get('生成Excelファイル数', 0)}個",
                 f"  📄 生成PDF: {summary.get('生成PDFファイル数', 0)}個",
                 f"  📥 ダウンロードPDF: {summary.get('ダウンロードPDFファイル数', 0)}個",
                 f"  📋 総PDFファイル: {summary.get('総PDFファイル数', 0)}個",
                 f"  🖼️ 生成画像: {summary.get('総画像数', 0)}枚",
                 f"  ✅ 変換成功: {summary.get('画像変換成功数', 0)}ファイル",
-                f"  ❌ 変換失敗: {summary.get('画像変換失敗数', 0)}ファイル"
+                f"  ❌ 変換失敗: {summary.get('画像変換失敗数', 0)}ファイル",
+                "",
+                trailer
             ]
             
-            # エラーがある場合は警告を追加
-            error_count = summary.get('エラーデータ件数', 0)
-            if error_count > 0:
-                lines.extend([
-                    "",
-                    "⚠️ エラーが発生しています。",
-                    "詳細はエラーレポートを確認してください。"
-                ])
-            else:
-                lines.extend([
-                    "",
-                    "✨ すべて正常に処理されました！"
-                ])
-            
             return "\n".join(lines)
             
         except Exception as e:
@@ -173,16 +280,15 @@ class LineBotNotifier:
             # エラーを種別ごとに集計
             error_summary = self._summarize_errors(errors)
             
-            lines.append("")
-            lines.append("📋 エラー種別:")
-            
-            for error_type, count in error_summary.items():
-                lines.append(f"  • {error_type}: {count}件")
+            lines.extend([
+                "",
+                "📋 エラー種別:",
+                "\n".join(f"  • {error_type}: {count}件" for error_type, count in error_summary.items()),
+                "",
+                "🔍 主要エラー:"
+            ])
             
             # 上位エラーの詳細を表示（最大5件）
-            lines.append("")
-            lines.append("🔍 主要エラー:")
-            
             for i, error in enumerate(errors[:5]):
                 lines.append(f"  {i+1}. {error.item_name}")
                 lines.append(f"     {error.description}")
@@ -205,19 +311,13 @@ class LineBotNotifier:
     
     def _summarize_errors(self, errors: List[ValidationError]) -> Dict[str, int]:
         """エラーを種別ごとに集計"""
-        summary = {}
-        
-        for error in errors:
-            error_type = error.error_type
-            if error_type in summary:
-                summary[error_type] += 1
-            else:
-                summary[error_type] = 1
-        
-        # 件数順にソート
-        sorted_summary = dict(sorted(summary.items(), key=lambda x: x[1], reverse=True))
-        
-        return sorted_summary
+        # 件数順（同数の場合は出現順）に並べて返す
+        return dict(Counter(error.error_type for error in errors).most_common())
+    
+    @staticmethod
+    def _now_str(fmt: str = '%Y-%m-%d %H:%M:%S') -> str:
+        """現在時刻を文字列で取得"""
+        return datetime.now().strftime(fmt)
     
     def send_start_notification(self) -> bool:
         """処理開始通知を送信"""
@@ -227,7 +327,7 @@ class LineBotNotifier:
             message = (
                 "🚀 SMCL 納品リスト処理開始\n"
                 "\n"
-                f"開始時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"開始時刻: {self._now_str()}\n"
                 "\n"
                 "処理内容:\n"
                 "1. スマクラからの納品リストダウンロード\n"
@@ -249,17 +349,9 @@ class LineBotNotifier:
         try:
             self.logger.info(f"フェーズ通知送信: {phase} {status}")
             
-            emoji_map = {
-                "スクレイピング": "🕷️",
-                "データ抽出": "📄",
-                "マスタ付け合わせ": "🔍",
-                "Excel生成": "📊",
-                "通知": "📢"
-            }
-            
-            emoji = emoji_map.get(phase, "⚙️")
+            emoji = self._PHASE_EMOJI_MAP.get(phase, "⚙️")
             
-            message = f"{emoji} {phase} {status}\n{datetime.now().strftime('%H:%M:%S')}"
+            message = f"{emoji} {phase} {status}\n{self._now_str('%H:%M:%S')}"
             
             return self.send_message(message)
             
@@ -275,7 +367,7 @@ class LineBotNotifier:
             message = (
                 "🆘 緊急エラー発生\n"
                 "\n"
-                f"発生時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"発生時刻: {self._now_str()}\n"
                 "\n"
                 f"エラー内容:\n{error_message}\n"
                 "\n"
@@ -326,7 +418,7 @@ class LineBotNotifier:
             test_message = (
                 "🧪 LINE Bot接続テスト\n"
                 "\n"
-                f"テスト時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"テスト時刻: {self._now_str()}\n"
                 "\n"
                 "このメッセージが届いていれば、\n"
                 "LINE Bot設定は正常です。"
@@ -352,11 +444,6 @@ class LineBotNotifier:
             return False
         
         try:
-            headers = {
-                'Authorization': f'Bearer {self.channel_access_token}',
-                'Content-Type': 'application/json'
-            }
-            
             data = {
                 'to': self.group_id,
                 'messages': [
@@ -369,12 +456,7 @@ class LineBotNotifier:
                 ]
             }
             
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                data=json.dumps(data),
-                timeout=10
-            )
+            response = self._post_push_message(data)
             
             if response.status_code == 200:
                 self.logger.info("LINE 画像送信成功")
@@ -705,11 +787,6 @@ class LineBotNotifier:
     def _send_document_message(self, document_url: str, title: str, filename: str) -> bool:
         """ドキュメントメッセージを送信"""
         try:
-            headers = {
-                'Authorization': f'Bearer {self.channel_access_token}',
-                'Content-Type': 'application/json'
-            }
-            
             # Flex Message形式でPDFダウンロードリンクを作成
             flex_content = {
                 "type": "bubble",
@@ -769,12 +846,7 @@ class LineBotNotifier:
                 ]
             }
             
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                data=json.dumps(data),
-                timeout=10
-            )
+            response = self._post_push_message(data)
             
             if response.status_code == 200:
                 self.logger.info("LINE PDF送信成功")
@@ -995,7 +1067,8 @@ class LineBotNotifier:
         error_data: List = None,
         converted_images: Dict[str, List[Path]] = None,
         max_images: int = 3,
-        send_all_delivery_lists: bool = True
+        send_all_delivery_lists: bool = True,
+        include_error_details: bool = False
     ) -> bool:
         """
         統合された処理完了通知を送信（ビジネス向け）
@@ -1005,6 +1078,7 @@ class LineBotNotifier:
             error_data: エラーデータのリスト
             converted_images: 変換済み画像の辞書
             max_images: 最大送信画像数
+            include_error_details: エラー詳細メッセージを同じリクエストで送信するか
         
         Returns:
             送信成功可否
@@ -1016,9 +1090,11 @@ class LineBotNotifier:
         try:
             self.logger.info("統合完了通知の送信開始")
             
-            # メイン通知メッセージを送信
-            main_message = self._build_integrated_message(summary, error_data)
-            self.send_message(main_message)
+            # メイン通知メッセージを送信（エラー詳細がある場合は1回のリクエストにまとめる）
+            messages = [self._build_integrated_message(summary, error_data)]
+            if include_error_details and error_data:
+                messages.append(self._build_error_message(error_data))
+            self.send_messages(messages)
             
             # 重要なPDF画像のみを送信（ビジネス側に必要最小限）
             if converted_images:
@@ -1079,38 +1155,35 @@ class LineBotNotifier:
                 return True
             
             # ビジネス側に重要なPDFファイルを優先順位付けして選択
-            priority_files = []
+            # （1回の走査で優先度別に振り分け。優先度順に連結すればソート不要）
+            dispatch_request_files = []  # 1. 出庫依頼書（最も重要）
+            dispatch_table_files = []    # 2. 配車表・アリスト
+            delivery_list_files = []     # 3. 納品リスト（参考用）
             
-            # 1. 出庫依頼書（最も重要）
             for pdf_name, image_paths in converted_images.items():
-                if "出庫依頼" in pdf_name and image_paths:
-                    priority_files.extend([(pdf_name, path, 1) for path in image_paths[:2]])  # 最大2ページ
-            
-            # 2. 配車表・アリスト
-            for pdf_name, image_paths in converted_images.items():
-                if ("アリスト" in pdf_name or "配車" in pdf_name or "LT" in pdf_name) and image_paths:
-                    priority_files.extend([(pdf_name, path, 2) for path in image_paths[:1]])  # 最大1ページ
-                    
-            # 3. 納品リスト（参考用）
-            for pdf_name, image_paths in converted_images.items():
-                if "納品リスト" in pdf_name and image_paths:
+                if not image_paths:
+                    continue
+                
+                if "出庫依頼" in pdf_name:
+                    dispatch_request_files.extend([(pdf_name, path, 1) for path in image_paths[:2]])  # 最大2ページ
+                
+                if _DISPATCH_TABLE_NAME_RE.search(pdf_name):
+                    dispatch_table_files.extend([(pdf_name, path, 2) for path in image_paths[:1]])  # 最大1ページ
+                
+                if "納品リスト" in pdf_name:
                     if send_all_delivery_lists:
                         # 全ての納品リスト画像を送信
-                        priority_files.extend([(pdf_name, path, 3) for path in image_paths])
+                        delivery_list_files.extend([(pdf_name, path, 3) for path in image_paths])
                         self.logger.info(f"納品リスト全画像追加: {pdf_name} ({len(image_paths)}枚)")
                     else:
                         # 従来通り最大1ページ
-                        priority_files.extend([(pdf_name, path, 3) for path in image_paths[:1]])  # 最大1ページ
+                        delivery_list_files.extend([(pdf_name, path, 3) for path in image_paths[:1]])  # 最大1ページ
             
-            # 優先度でソートし、最大画像数まで制限
-            priority_files.sort(key=lambda x: x[2])
+            high_priority_files = dispatch_request_files + dispatch_table_files
             
             if send_all_delivery_lists:
                 # 全ての納品リストを送信する場合
                 # 優先度1,2（出庫依頼書、配車表）を優先選択
-                high_priority_files = [f for f in priority_files if f[2] <= 2]
-                delivery_list_files = [f for f in priority_files if f[2] == 3]  # 納品リスト
-                
                 # 高優先度ファイルを制限内で選択
                 selected_high_priority = high_priority_files[:max_images]
                 
@@ -1120,7 +1193,7 @@ class LineBotNotifier:
                 self.logger.info(f"高優先度画像: {len(selected_high_priority)}枚, 納品リスト: {len(delivery_list_files)}枚")
             else:
                 # 従来通りの制限
-                selected_files = priority_files[:max_images]
+                selected_files = (high_priority_files + delivery_list_files)[:max_images]
             
             if not selected_files:
                 self.logger.info("送信する重要画像が見つかりませんでした")
@@ -1138,7 +1211,7 @@ class LineBotNotifier:
                     # ファイルタイプに応じたタイトルを設定
                     if "出庫依頼" in pdf_name:
                         title = "📄 出庫依頼書"
-                    elif any(keyword in pdf_name for keyword in ["アリスト", "配車", "LT"]):
+                    elif _DISPATCH_TABLE_NAME_RE.search(pdf_name):
                         title = "🚛 配車表"
                     elif "納品リスト" in pdf_name:
                         title = "📋 納品リスト"
@@ -4,6 +4,7 @@
 SMCL スクレイピングモジュール
 """
 
+import os
 import time
 import platform
 from pathlib import Path
@@ -20,6 +21,77 @@ from datetime import datetime
 from ..core.logger import Logger
 
 
+# 解決済みChromeDriverパスの保存先（次回起動時のバージョン確認・ダウンロードを省略）
+_DRIVER_PATH_CACHE_FILE = Path.home() / '.cache' / 'smcl' / 'driver_path'
+
+# ヘッドレスモードで取得しないリソース（画面操作に不要な画像・フォント・解析タグ）
+_HEADLESS_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf",
+    "*/analytics*", "*/gtag*"
+]
+
+# 再ログインボタン（ID指定を優先し、ない場合はリンクテキストで検索）
+_RELOGIN_BUTTON_XPATH = (
+    "//*[@id='LogoutLinkButton']"
+    " | //a[contains(text(), '再ログイン')][not(//*[@id='LogoutLinkButton'])]"
+)
+
+# ダウンロード中の一時ファイルの拡張子（Chrome）
+_PARTIAL_DOWNLOAD_SUFFIX = '.crdownload'
+
+# 入力欄への値設定（input/changeイベントも発火させる）
+_JS_FILL_FIELDS = """
+const missing = [];
+for (const [id, value] of Object.entries(arguments[0])) {
+    const el = document.getElementById(id);
+    if (!el) { missing.push(id); continue; }
+    el.value = value;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return missing;
+"""
+
+# 検索結果の状態（データ行数とメッセージエリアの内容。メッセージエリアがない場合はnull）
+_JS_SEARCH_RESULT_STATE = """
+const message = document.getElementById('ctl00_messageArea_RepeatMessage_ctl00_messageLabel');
+const rows = document.evaluate(
+    '//table//tr[position()>1]', document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+);
+return {
+    message: message ? message.innerText.trim() : null,
+    rowCount: rows.snapshotLength
+};
+"""
+
+# 表示されている受注リンクのID一覧（ctl02からctl19まで、見つからなくなった時点で終了）
+_JS_AVAILABLE_ORDER_LINKS = """
+const links = [];
+for (let i = 2; i < 20; i++) {
+    const id = `ctl00_ContentPlaceHolder1_GridView1_ctl${String(i).padStart(2, '0')}_ImpDateLinkButton`;
+    const el = document.getElementById(id);
+    if (!el) { break; }
+    if (el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden') {
+        links.push(id);
+    }
+}
+return links;
+"""
+
+# セレクトボックスの値変更（changeイベントも発火させる）
+_JS_SELECT_VALUE = """
+const select = document.getElementById(arguments[0]);
+if (!select) { return null; }
+const option = Array.from(select.options).find(o => o.value === arguments[1]);
+if (!option) { return null; }
+const before = select.selectedIndex >= 0 ? select.options[select.selectedIndex].text : '';
+select.value = arguments[1];
+select.dispatchEvent(new Event('change', {bubbles: true}));
+return [before, option.text];
+"""
+
+
 class SMCLScraper:
     """SMCL Webサイトのスクレイピングクラス"""
     
@@ -60,6 +132,7 @@ class SMCLScraper:
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
             chrome_options.add_argument('--disable-gpu')
+            chrome_options.add_argument('--disable-extensions')
             chrome_options.add_argument('--window-size=1920,1080')
             
             if self.headless:
@@ -77,23 +150,21 @@ class SMCLScraper:
                 "download.directory_upgrade": True,
                 "safebrowsing.enabled": True
             }
+            if self.headless:
+                # 画面表示しない場合は画像の読み込みを省略（描画負荷とメモリを削減）
+                prefs["profile.managed_default_content_settings.images"] = 2
             chrome_options.add_experimental_option("prefs", prefs)
             
             # ChromeDriverManagerを使用
             self.logger.info(f"システム: {platform.system()} ({platform.machine()})")
-            driver_path = ChromeDriverManager().install()
+            driver_path = self._resolve_driver_path()
             
             if platform.system() == 'Windows':
                 driver_path = driver_path.replace('/', '\\')
             
             service = Service(driver_path)
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # ヘッドレスモードでのダウンロード設定
-            self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {
-                "behavior": "allow",
-                "downloadPath": download_dir_str
-            })
+            self._configure_driver(download_dir_str)
             
             self.logger.info("ChromeDriver の初期化が完了しました")
             return True
@@ -101,19 +172,113 @@ class SMCLScraper:
         except Exception as e:
             self.logger.error(f"ChromeDriver の初期化に失敗しました: {str(e)}")
             
+            # Chrome更新などで保存済みのドライバーが使えない可能性があるため、次回は再取得する
+            _DRIVER_PATH_CACHE_FILE.unlink(missing_ok=True)
+            
             # 代替方法を試行
             try:
                 self.driver = webdriver.Chrome(options=chrome_options)
-                self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {
-                    "behavior": "allow",
-                    "downloadPath": download_dir_str
-                })
+                self._configure_driver(download_dir_str)
                 self.logger.info("代替方法でChromeDriverを初期化しました")
                 return True
             except Exception as e2:
                 self.logger.error(f"代替方法も失敗しました: {str(e2)}")
                 return False
     
+    def _configure_driver(self, download_dir_str):
+        """起動したブラウザにダウンロード先と通信設定を適用"""
+        # ヘッドレスモードでのダウンロード設定
+        self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+            "behavior": "allow",
+            "downloadPath": download_dir_str
+        })
+        
+        if self.headless:
+            # 画面表示しない場合は画像・フォント・解析タグの取得を止め、HTTPキャッシュを有効にする
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _HEADLESS_BLOCKED_URLS})
+    
+    def _resolve_driver_path(self):
+        """ChromeDriverのパスを取得（環境変数SMCL_DRIVER_PATH、前回のパスの順に優先し、なければインストール）"""
+        env_path = os.getenv('SMCL_DRIVER_PATH')
+        if env_path and os.path.isfile(env_path):
+            self.logger.info(f"環境変数のChromeDriverを使用: {env_path}")
+            return env_path
+        
+        try:
+            cached_path = _DRIVER_PATH_CACHE_FILE.read_text(encoding='utf-8').strip()
+            if cached_path and os.path.isfile(cached_path):
+                self.logger.info(f"保存済みのChromeDriverを使用: {cached_path}")
+                return cached_path
+        except OSError:
+            pass
+        
+        driver_path = ChromeDriverManager().install()
+        try:
+            _DRIVER_PATH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _DRIVER_PATH_CACHE_FILE.write_text(driver_path, encoding='utf-8')
+        except OSError as e:
+            self.logger.warning(f"ChromeDriverパスの保存に失敗しました: {str(e)}")
+        return driver_path
+    
+    def _wait_for_page_ready(self, timeout=15):
+        """ページ読み込み完了（document.readyState == complete）を待つ"""
+        WebDriverWait(self.driver, timeout).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
+    
+    def _click_and_wait(self, element, timeout=15):
+        """要素をクリックし、ページ遷移（旧ページの破棄）と読み込み完了を待つ"""
+        old_page = self.driver.find_element(By.TAG_NAME, "html")
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        element.click()
+        
+        # 固定時間待たずに、旧ページの要素が破棄された時点で遷移完了とみなす
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.staleness_of(old_page))
+        except TimeoutException:
+            self.logger.debug("ページ遷移は検出されませんでした")
+        self._wait_for_page_ready(timeout)
+    
+    def _js_fill_fields(self, field_values):
+        """複数の入力欄に1回のスクリプト実行で値を設定（見つからなかった要素IDのリストを返す）"""
+        return self.driver.execute_script(_JS_FILL_FIELDS, field_values)
+    
+    def _js_select_value(self, select_id, value):
+        """セレクトボックスの値を1回のスクリプト実行で変更し、(変更前, 変更後)の表示テキストを返す"""
+        result = self.driver.execute_script(_JS_SELECT_VALUE, select_id, value)
+        if result is None:
+            raise NoSuchElementException(f"選択肢が見つかりません: {select_id}={value}")
+        return result[0], result[1]
+    
+    def _list_download_names(self):
+        """ダウンロードディレクトリ内のファイル名一覧を取得"""
+        try:
+            with os.scandir(self.download_dir) as entries:
+                return {entry.name for entry in entries}
+        except FileNotFoundError:
+            return set()
+    
+    def _downloads_settled(self, before_names=None):
+        """ダウンロード中の一時ファイルがなく、（指定時は）新しいファイルが追加されているか"""
+        names = self._list_download_names()
+        if any(name.endswith(_PARTIAL_DOWNLOAD_SUFFIX) for name in names):
+            return False
+        return before_names is None or bool(names - before_names)
+    
+    def _wait_for_download(self, before_names, timeout=30):
+        """クリック前のファイル一覧と比較し、新しいファイルのダウンロード完了を待つ"""
+        try:
+            # 固定時間待たずに、完了したファイルが現れた時点で次へ進む
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(
+                lambda driver: self._downloads_settled(before_names)
+            )
+            return True
+        except TimeoutException:
+            self.logger.warning(f"ダウンロード完了を確認できませんでした（{timeout}秒）")
+            return False
+    
     def access_site(self):
         """SMCLサイトにアクセス"""
         try:
@@ -125,9 +290,7 @@ class SMCLScraper:
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
-            WebDriverWait(self.driver, 10).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
+            self._wait_for_page_ready(10)
             
             self.logger.info(f"現在のURL: {self.driver.current_url}")
             self.logger.info(f"ページタイトル: {self.driver.title}")
@@ -147,61 +310,38 @@ class SMCLScraper:
     def _handle_relogin_button(self):
         """再ログインボタンの処理"""
         try:
-            # ID指定での検索を優先
-            relogin_button = self.driver.find_element(By.ID, "LogoutLinkButton")
-            self.logger.info("再ログインボタンが見つかりました（ID指定）")
+            # ID指定とテキスト検索を1回の検索で行う（ID指定の要素がある場合はそちらを優先）
+            relogin_button = self.driver.find_element(By.XPATH, _RELOGIN_BUTTON_XPATH)
+            self.logger.info("再ログインボタンが見つかりました")
             
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", relogin_button)
-            time.sleep(1)
-            relogin_button.click()
+            self._click_and_wait(relogin_button, 10)
             self.logger.info("再ログインボタンをクリックしました")
             
-            time.sleep(3)
-            WebDriverWait(self.driver, 10).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
-            
         except NoSuchElementException:
-            try:
-                # テキスト検索を試行
-                relogin_button = self.driver.find_element(By.XPATH, "//a[contains(text(), '再ログイン')]")
-                self.logger.info("再ログインボタンが見つかりました（テキスト検索）")
-                
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", relogin_button)
-                time.sleep(1)
-                relogin_button.click()
-                self.logger.info("再ログインボタンをクリックしました")
-                
-                time.sleep(3)
-                
-            except NoSuchElementException:
-                self.logger.info("再ログインボタンが見つかりませんでした")
+            self.logger.info("再ログインボタンが見つかりませんでした")
     
     def login(self):
         """SMCLサイトにログイン"""
         try:
             self.logger.info("ログイン処理開始")
             
-            # 企業コード入力
-            corp_field = WebDriverWait(self.driver, 10).until(
+            # ログインフォームの表示を待つ
+            WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, "FormView2_CorpCdTextBox"))
             )
-            corp_field.clear()
-            corp_field.send_keys(self.corp_code)
-            self.logger.info(f"企業コード入力: {self.corp_code}")
             
-            # ログインID入力
-            login_field = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "FormView1_LoginIdTextBox"))
-            )
-            login_field.clear()
-            login_field.send_keys(self.login_id)
-            self.logger.info(f"ログインID入力: {self.login_id}")
+            # 企業コード・ログインID・パスワードを1回のスクリプト実行で入力
+            missing_fields = self._js_fill_fields({
+                "FormView2_CorpCdTextBox": self.corp_code,
+                "FormView1_LoginIdTextBox": self.login_id,
+                "FormView1_LoginPwTextBox": self.password
+            })
+            if missing_fields:
+                self.logger.error(f"ログインフォームの入力欄が見つかりません: {missing_fields}")
+                return False
             
-            # パスワード入力
-            password_field = self.driver.find_element(By.ID, "FormView1_LoginPwTextBox")
-            password_field.clear()
-            password_field.send_keys(self.password)
+            self.logger.info(f"企業コード入力: {self.corp_code}")
+            self.logger.info(f"ログインID入力: {self.login_id}")
             self.logger.info("パスワード入力完了")
             
             # ログインボタンクリック
@@ -209,13 +349,10 @@ class SMCLScraper:
                 EC.element_to_be_clickable((By.ID, "FormView1_btnLogin"))
             )
             
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", login_button)
-            time.sleep(1)
-            login_button.click()
+            self._click_and_wait(login_button, 10)
             self.logger.info("ログインボタンをクリックしました")
             
             # ログイン結果確認
-            time.sleep(3)
             current_url = self.driver.current_url
             
             # エラーメッセージチェック
@@ -244,9 +381,7 @@ class SMCLScraper:
         try:
             self.logger.info("ユーザー選択処理開始")
             
-            WebDriverWait(self.driver, 10).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
+            self._wait_for_page_ready(10)
             
             # ユーザー選択リンクをクリック
             user_link = WebDriverWait(self.driver, 15).until(
@@ -255,17 +390,10 @@ class SMCLScraper:
             
             self.logger.info(f"ユーザー選択リンク: {user_link.text}")
             
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", user_link)
-            time.sleep(1)
-            user_link.click()
+            # クリックして遷移完了を待つ
+            self._click_and_wait(user_link, 15)
             self.logger.info("ユーザー選択リンクをクリックしました")
             
-            # 遷移完了を待つ
-            time.sleep(3)
-            WebDriverWait(self.driver, 15).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
-            
             self.logger.info("アプリトップへの遷移が完了しました")
             return True
             
@@ -279,8 +407,6 @@ class SMCLScraper:
     def _set_search_date(self):
         """検索日付を今日の日付に設定"""
         try:
-            from datetime import datetime, timedelta
-            
             # 今日の日付を取得（yyyy/mm/dd形式）
             today_str = datetime.now().strftime('%Y/%m/%d')
             # 昨日の日付を取得
@@ -299,38 +425,25 @@ class SMCLScraper:
             
             self.logger.info(f"検索日付を設定しました: {today_str}")
             
-            # 少し待つ（JavaScript処理のため）
-            time.sleep(1)
-            
         except TimeoutException:
             self.logger.warning("日付入力欄が見つかりませんでした")
         except Exception as e:
             self.logger.error(f"日付設定エラー: {str(e)}")
     
-    def _check_no_data_message(self):
-        """「該当するデータがありません。」メッセージをチェック"""
-        try:
-            # メッセージエリアを検索
-            message_element = self.driver.find_element(
-                By.ID, "ctl00_messageArea_RepeatMessage_ctl00_messageLabel"
-            )
-            
-            message_text = message_element.text.strip()
-            self.logger.info(f"メッセージエリアの内容: '{message_text}'")
-            
-            if "該当するデータがありません" in message_text:
-                self.logger.warning("🔍 該当するデータがありません - メッセージを検出しました")
-                return True
-            
-            return False
-            
-        except NoSuchElementException:
+    def _check_no_data_message(self, message_text):
+        """「該当するデータがありません。」メッセージをチェック（message_text: メッセージエリアの内容、要素がない場合はNone）"""
+        if message_text is None:
             # メッセージエリアが見つからない（通常の検索結果がある場合）
             self.logger.debug("メッセージエリアが見つかりませんでした（データありの状態）")
             return False
-        except Exception as e:
-            self.logger.error(f"データなしメッセージチェックエラー: {str(e)}")
-            return False
+        
+        self.logger.info(f"メッセージエリアの内容: '{message_text}'")
+        
+        if "該当するデータがありません" in message_text:
+            self.logger.warning("🔍 該当するデータがありません - メッセージを検出しました")
+            return True
+        
+        return False
     
     def navigate_to_order_list_and_search(self):
         """受注一覧に遷移して検索"""
@@ -342,17 +455,10 @@ class SMCLScraper:
                 EC.element_to_be_clickable((By.ID, "ctl00_tab3link"))
             )
             
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", tab_link)
-            time.sleep(1)
-            tab_link.click()
+            # クリックしてページ読み込み完了を待つ
+            self._click_and_wait(tab_link, 15)
             self.logger.info("受注一覧タブをクリックしました")
             
-            # ページ読み込み完了を待つ
-            time.sleep(3)
-            WebDriverWait(self.driver, 15).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
-            
             # =======================================================
             # 🚨 検索条件設定（現状：test_modeに関係なく同じ条件）
             # =======================================================
@@ -388,23 +494,16 @@ class SMCLScraper:
                 EC.element_to_be_clickable((By.ID, "ctl00_ContentPlaceHolder1_FormView1_Button1"))
             )
             
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", search_button)
-            time.sleep(1)
-            search_button.click()
+            # クリックして検索結果読み込み完了を待つ
+            self._click_and_wait(search_button, 20)
             self.logger.info("検索ボタンをクリックしました")
             
-            # 検索結果読み込み完了を待つ
-            time.sleep(5)
-            WebDriverWait(self.driver, 20).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
-            
-            # 検索結果確認
-            rows = self.driver.find_elements(By.XPATH, "//table//tr[position()>1]")
-            self.logger.info(f"検索結果データ行数: {len(rows)}")
+            # 検索結果確認（データ行数とメッセージエリアの内容を1回のスクリプト実行で取得）
+            state = self.driver.execute_script(_JS_SEARCH_RESULT_STATE)
+            self.logger.info(f"検索結果データ行数: {state['rowCount']}")
             
             # 「該当するデータがありません。」メッセージをチェック
-            if self._check_no_data_message():
+            if self._check_no_data_message(state['message']):
                 self.logger.warning("🔍 該当するデータが見つかりませんでした")
                 self.no_data_found = True
                 return True  # エラーではないので True を返す
@@ -432,29 +531,20 @@ class SMCLScraper:
                 EC.element_to_be_clickable((By.ID, link_id))
             )
             
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", detail_link)
-            time.sleep(1)
-            detail_link.click()
+            # クリックしてページ読み込み完了を待つ
+            self._click_and_wait(detail_link, 15)
             self.logger.info("受注伝票詳細リンクをクリックしました")
             
-            # ページ読み込み完了を待つ
-            time.sleep(3)
+            # 印刷種類を「納品リストD（集計）」に変更（選択と表示テキストの取得を1回のスクリプト実行で行う）
             WebDriverWait(self.driver, 15).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
-            
-            # 印刷種類を「納品リストD（集計）」に変更
-            print_kind_select = WebDriverWait(self.driver, 15).until(
                 EC.presence_of_element_located((By.ID, "ctl00_ContentPlaceHolder1_FormView2_PrintKindDropDownList"))
             )
             
-            select = Select(print_kind_select)
-            current_option = select.first_selected_option
-            self.logger.info(f"現在の印刷種類: {current_option.text}")
-            
-            select.select_by_value("0400")  # 納品リストD（集計）
-            selected_option = select.first_selected_option
-            self.logger.info(f"変更後の印刷種類: {selected_option.text}")
+            current_text, selected_text = self._js_select_value(
+                "ctl00_ContentPlaceHolder1_FormView2_PrintKindDropDownList", "0400"  # 納品リストD（集計）
+            )
+            self.logger.info(f"現在の印刷種類: {current_text}")
+            self.logger.info(f"変更後の印刷種類: {selected_text}")
             
             time.sleep(1)
             
@@ -464,12 +554,13 @@ class SMCLScraper:
             )
             
             self.driver.execute_script("arguments[0].scrollIntoView(true);", print_button)
-            time.sleep(1)
+            before_names = self._list_download_names()
             print_button.click()
             self.logger.info("印刷ボタンをクリックしました（ダウンロード開始）")
             
             # ダウンロード完了を待つ
-            time.sleep(5)
+            if not self._wait_for_download(before_names):
+                self.logger.warning("納品リストのダウンロードを確認できないまま処理を続行します")
             
             # 確定処理（フラグによって制御）
             if self.enable_confirmation_process:
@@ -481,7 +572,6 @@ class SMCLScraper:
                 )
                 
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", checkbox)
-                time.sleep(1)
                 checkbox.click()
                 self.logger.info("チェックボックスをクリックしました")
 
@@ -489,14 +579,13 @@ class SMCLScraper:
                 confirm_button = WebDriverWait(self.driver, 15).until(
                     EC.element_to_be_clickable((By.ID, "ctl00_ContentPlaceHolder1_DecideButton"))
                 )
-                confirm_button.click()
+                self._click_and_wait(confirm_button, 15)
                 self.logger.info("確定ボタンをクリックしました")
             else:
                 self.logger.info("🧪 テストモードのため確定処理をスキップしました")
                 self.logger.info("   - チェックボックスクリック: スキップ")
                 self.logger.info("   - 確定ボタンクリック: スキップ")
             
-            time.sleep(2)
             return True
             
         except TimeoutException:
@@ -506,26 +595,6 @@ class SMCLScraper:
             self.logger.error(f"受注伝票詳細処理エラー: {str(e)}")
             return False
     
-    def check_no_data_message(self):
-        """「該当するデータがありません」メッセージをチェック"""
-        try:
-            message_element = self.driver.find_element(By.ID, "ctl00_messageArea_RepeatMessage_ctl00_messageLabel")
-            message_text = message_element.text.strip()
-            
-            if "該当するデータがありません" in message_text:
-                self.logger.info("「該当するデータがありません」メッセージを確認")
-                return True
-            else:
-                self.logger.info("まだ処理すべきデータがあります")
-                return False
-                
-        except NoSuchElementException:
-            self.logger.info("メッセージ要素が見つかりません（データがある可能性）")
-            return False
-        except Exception as e:
-            self.logger.error(f"メッセージ確認エラー: {str(e)}")
-            return False
-    
     def download_delivery_lists(self):
         """納品リストをダウンロード（メイン処理）"""
         try:
@@ -566,8 +635,8 @@ class SMCLScraper:
                     self.logger.error("受注一覧検索に失敗")
                     break
                 
-                # データ存在確認
-                if self.check_no_data_message():
+                # データ存在確認（検索時に確認済みの結果を使用）
+                if self.no_data_found:
                     self.logger.info("すべての納品リストのダウンロードが完了")
                     return True
                 
@@ -620,8 +689,6 @@ class SMCLScraper:
                 if test_mode and len(processed_orders) >= 10:
                     self.logger.info(f"🧪 テストモード: 最大処理件数({len(processed_orders)}件)に達したため終了")
                     return True
-                
-                time.sleep(3)
             
             if attempt >= max_attempts:
                 self.logger.warning(f"最大試行回数({max_attempts})に達したため処理を終了")
@@ -642,10 +709,10 @@ class SMCLScraper:
             download_button = WebDriverWait(self.driver, 15).until(
                 EC.element_to_be_clickable((By.ID, "ctl00_ContentPlaceHolder1_DownloadButton"))
             )
+            before_names = self._list_download_names()
             download_button.click()
             self.logger.info("CSVダウンロードボタンをクリックしました")
-            time.sleep(5)
-            return True
+            return self._wait_for_download(before_names)
         except Exception as e:
             self.logger.error(f"CSVダウンロードエラー: {str(e)}")
             return False
@@ -653,24 +720,9 @@ class SMCLScraper:
     def _get_available_order_links(self):
         """現在利用可能な受注リンクのIDリストを取得"""
         try:
-            available_links = []
-            
-            # GridView内の全ての受注リンクを検索
+            # GridView内の全ての受注リンクを1回のスクリプト実行で検索（表示されているもののみ）
             # パターン: ctl00_ContentPlaceHolder1_GridView1_ctl0X_ImpDateLinkButton
-            for i in range(2, 20):  # ctl02からctl19まで（安全のため広めに検索）
-                link_id = f"ctl00_ContentPlaceHolder1_GridView1_ctl0{i}_ImpDateLinkButton"
-                
-                try:
-                    element = self.driver.find_element(By.ID, link_id)
-                    if element.is_displayed() and element.is_enabled():
-                        available_links.append(link_id)
-                        self.logger.debug(f"利用可能なリンク発見: {link_id}")
-                except NoSuchElementException:
-                    # 要素が見つからない場合は終了
-                    break
-                except Exception as e:
-                    self.logger.debug(f"リンクチェックエラー {link_id}: {e}")
-                    continue
+            available_links = self.driver.execute_script(_JS_AVAILABLE_ORDER_LINKS) or []
             
             self.logger.info(f"利用可能な受注リンク: {len(available_links)}件")
             for link_id in available_links:
@@ -687,20 +739,15 @@ class SMCLScraper:
         try:
             self.logger.info("📋 受注一覧画面に戻ります")
             
-            # まずブラウザの戻るボタンを試す
+            # まずブラウザの戻るボタンを試す（読み込み完了を待ってからURLを確認）
             self.driver.back()
-            time.sleep(2)
+            self._wait_for_page_ready(15)
             
             # さらに一覧画面に戻る必要がある場合
             current_url = self.driver.current_url
             if "EDS001VORD" not in current_url:
                 self.driver.back()
-                time.sleep(2)
-            
-            # ページ読み込み完了を待つ
-            WebDriverWait(self.driver, 15).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
+                self._wait_for_page_ready(15)
             
             self.logger.info("✅ 受注一覧画面に戻りました")
             return True
@@ -753,7 +800,13 @@ class SMCLScraper:
         """リソースのクリーンアップ"""
         if self.driver:
             try:
-                time.sleep(2)
+                # ダウンロード中のファイルがあれば完了を待ってから閉じる
+                try:
+                    WebDriverWait(self.driver, 10, poll_frequency=0.2).until(
+                        lambda driver: self._downloads_settled()
+                    )
+                except TimeoutException:
+                    self.logger.warning("ダウンロード中のファイルが残っています")
                 self.driver.quit()
                 self.logger.info("ブラウザを閉じました")
             except Exception as e: